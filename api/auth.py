@@ -6,6 +6,7 @@ fastfish-lite API 鉴权。
 
 from __future__ import annotations
 
+import hmac
 import logging
 from typing import Annotated
 
@@ -18,11 +19,19 @@ logger = logging.getLogger(__name__)
 
 _security = HTTPBearer(auto_error=False)
 
+# 鉴权配置在启动时固定，避免每个请求重复读取 settings
+_settings = get_settings()
+_API_KEY: bytes | None = _settings.api_key.encode() if _settings.api_key else None
+_ALLOW_LOCAL: bool = _settings.allow_local_no_auth
+_LOCAL_IPS = frozenset({"127.0.0.1", "localhost", "::1"})
+
 
 def _get_client_ip(request: Request) -> str:
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0].strip()
+        idx = forwarded.find(",")
+        first = forwarded if idx < 0 else forwarded[:idx]
+        return first.strip()
     return request.client.host if request.client else ""
 
 
@@ -33,21 +42,14 @@ def _get_api_key_from_header(request: Request) -> str | None:
 def _verify_token(token: str) -> bool:
     if not token or not token.strip():
         return False
-    settings = get_settings()
-    api_key = getattr(settings, "api_key", None)
-    if api_key and token == api_key:
-        return True
-    return False
+    return _API_KEY is not None and hmac.compare_digest(token.encode(), _API_KEY)
 
 
 async def require_auth(
     request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(_security)] = None,
 ) -> None:
-    settings = get_settings()
-    client_ip = _get_client_ip(request)
-
-    if settings.allow_local_no_auth and client_ip in ("127.0.0.1", "localhost", "::1"):
+    if _ALLOW_LOCAL and _get_client_ip(request) in _LOCAL_IPS:
         return
 
     token: str | None = None
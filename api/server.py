@@ -8,7 +8,9 @@ from __future__ import annotations
 
 import logging
 import uuid
-from typing import Any
+from contextlib import asynccontextmanager
+from html import escape as html_escape
+from typing import Any, AsyncIterator
 
 from pathlib import Path
 
@@ -18,15 +20,27 @@ from pydantic import BaseModel
 
 from api.auth import require_auth
 from config import get_settings
-from core.articles import get_available_list, get_article_by_id, ingest_article, ingest_articles_batch, update_article
+from core.articles import (
+    get_article_by_id,
+    get_available_article_id,
+    get_available_list,
+    ingest_article,
+    ingest_articles_batch,
+    update_article,
+)
 from core.compliance import check_compliance_for_content
 from core.render import get_available_styles, render_markdown_to_html, _SUPPORTED_STYLES
+from core.sensitive import get_checker
 from core.template import normalize_to_wechat_format
 
 logger = logging.getLogger(__name__)
 
 _project_root = Path(__file__).resolve().parent.parent
 
+_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+_UPLOAD_CHUNK_SIZE = 1 << 20
+_ALLOWED_IMAGE_EXTS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp"})
+
 _STYLE_PREVIEW_MARKDOWN = """## 一缕春风过
 
 三月将至，草长莺飞的时节已在眼前。这个春节离春天如此之近，让人忍不住期盼起来。
@@ -44,6 +58,37 @@ _STYLE_PREVIEW_MARKDOWN = """## 一缕春风过
 愿你我都能在春光里，遇见更好的自己。"""
 
 
+# 预览页模板（%s 占位：样式名/标题、正文 HTML）
+_STYLE_PREVIEW_TPL = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>样式预览 - %s</title>
+<style>body { max-width: 680px; margin: 0 auto; padding: 24px; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }</style>
+</head>
+<body>
+<div class="markdown-body">%s</div>
+<p style="color:#999;font-size:12px;">fastfish-lite 开源精简版 · 商业版请联系获取完整功能</p>
+</body>
+</html>"""
+
+_ARTICLE_PREVIEW_TPL = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>%s</title>
+<style>body { max-width: 680px; margin: 0 auto; padding: 24px; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }</style>
+</head>
+<body>
+<h1>%s</h1>
+<div class="markdown-body">%s</div>
+<p style="color:#999;font-size:12px;">fastfish-lite 本地预览 · 微信发布需商业版</p>
+</body>
+</html>"""
+
+
 class RenderBody(BaseModel):
     markdown: str
     format_style: str = "minimal"
@@ -99,10 +144,20 @@ class IngestBatchBody(BaseModel):
     articles: list[IngestArticleItem]
 
 
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """启动时加载敏感词库，请求中直接读取加载结果。"""
+    checker = get_checker()
+    app.state.sensitive_checker = checker
+    app.state.sensitive_loaded = checker._ensure_loaded()
+    yield
+
+
 app = FastAPI(
     title="fastfish-lite",
     description="开源精简版：公众号格式整理、敏感词检测、每日热点。微信发布需商业版。",
     version="0.1.0-lite",
+    lifespan=_lifespan,
 )
 
 
@@ -123,12 +178,12 @@ def health() -> dict[str, str]:
 
 
 @app.get("/api/config/status")
-def api_config_status(_: None = Depends(require_auth)) -> dict[str, Any]:
+def api_config_status(request: Request, _: None = Depends(require_auth)) -> dict[str, Any]:
     """精简版配置状态：仅敏感词、API。"""
-    from core.sensitive import get_checker
     settings = get_settings()
-    checker = get_checker()
-    local_loaded = checker._ensure_loaded()
+    local_loaded = getattr(request.app.state, "sensitive_loaded", None)
+    if local_loaded is None:
+        local_loaded = get_checker()._ensure_loaded()
     return {
         "api_host": settings.api_host,
         "api_port": settings.api_port,
@@ -144,10 +199,11 @@ def api_config_status(_: None = Depends(require_auth)) -> dict[str, Any]:
 
 @app.get("/api/styles")
 def api_styles(_: None = Depends(require_auth)) -> dict[str, Any]:
-    styles = get_available_styles()
-    base = get_settings().api_base_url
-    for s in styles:
-        s["preview_url"] = f"{base.rstrip('/')}/api/styles/preview/{s['id']}" if base else ""
+    base = get_settings().api_base_url.rstrip("/")
+    styles = [
+        {**s, "preview_url": f"{base}/api/styles/preview/{s['id']}" if base else ""}
+        for s in get_available_styles()
+    ]
     return {"styles": styles}
 
 
@@ -157,20 +213,7 @@ def api_styles_preview(style_id: str) -> HTMLResponse:
         raise HTTPException(status_code=404, detail=f"样式不存在: {style_id}")
     html_body = render_markdown_to_html(_STYLE_PREVIEW_MARKDOWN, format_style=style_id)
     label = next((s["label"] for s in get_available_styles() if s["id"] == style_id), style_id)
-    full_html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1">
-<title>样式预览 - {label}</title>
-<style>body {{ max-width: 680px; margin: 0 auto; padding: 24px; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }}</style>
-</head>
-<body>
-<div class="markdown-body">{html_body}</div>
-<p style="color:#999;font-size:12px;">fastfish-lite 开源精简版 · 商业版请联系获取完整功能</p>
-</body>
-</html>"""
-    return HTMLResponse(content=full_html)
+    return HTMLResponse(content=_STYLE_PREVIEW_TPL % (label, html_body))
 
 
 @app.post("/api/articles/normalize")
@@ -186,41 +229,39 @@ def articles_check_compliance(body: CheckComplianceBody, _: None = Depends(requi
 
 @app.post("/api/images/upload")
 def api_images_upload(file: UploadFile = File(...), _: None = Depends(require_auth)) -> dict[str, Any]:
-    if not file.filename or not file.filename.lower().endswith((".jpg", ".jpeg", ".png", ".gif", ".webp")):
+    # 同步端点在线程池中执行，分块读写磁盘不阻塞事件循环
+    ext = Path(file.filename or "").suffix.lower()
+    if ext not in _ALLOWED_IMAGE_EXTS:
         raise HTTPException(status_code=400, detail="仅支持 jpg/png/gif/webp 图片")
-    try:
-        content = file.file.read()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"读取文件失败: {e}")
-    if len(content) > 10 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="图片过大，最大 10MB")
-    ext = Path(file.filename or "image.jpg").suffix.lower() or ".jpg"
     name = f"{uuid.uuid4().hex[:12]}{ext}"
     base = get_settings().images_base_path
     subdir = base / "uploaded"
     subdir.mkdir(parents=True, exist_ok=True)
     dest = subdir / name
-    dest.write_bytes(content)
+    total = 0
+    try:
+        with open(dest, "wb") as f:
+            while chunk := file.file.read(_UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > _UPLOAD_MAX_SIZE:
+                    raise HTTPException(status_code=400, detail="图片过大，最大 10MB")
+                f.write(chunk)
+    except HTTPException:
+        dest.unlink(missing_ok=True)
+        raise
+    except Exception as e:
+        dest.unlink(missing_ok=True)
+        raise HTTPException(status_code=400, detail=f"读取文件失败: {e}")
     return {"ok": True, "path": f"uploaded/{name}"}
 
 
 @app.get("/api/articles/available")
 def articles_available(_: None = Depends(require_auth)) -> dict[str, Any]:
     items = get_available_list()
-    out = []
-    for i, row in enumerate(items, start=1):
-        out.append({
-            "article_id": row["id"],
-            "list_index": i,
-            "title": row.get("rewritten_title") or "",
-            "summary": row.get("summary") or "",
-        })
-    return {"items": out, "total": len(out)}
+    return {"items": items, "total": len(items)}
 
 
-@app.get("/api/articles/preview-html/{article_id}", response_class=HTMLResponse)
-def articles_preview_html(article_id: int, _: None = Depends(require_auth)) -> HTMLResponse:
-    """本地 HTML 预览：生成完整 HTML 在浏览器中打开。"""
+def _article_preview_response(article_id: int) -> HTMLResponse:
     article = get_article_by_id(article_id)
     if not article:
         raise HTTPException(status_code=404, detail=f"文章不存在: article_id={article_id}")
@@ -232,21 +273,27 @@ def articles_preview_html(article_id: int, _: None = Depends(require_auth)) -> H
         html_body = render_markdown_to_html(content, format_style=format_style)
     else:
         html_body = content
-    full_html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-<meta charset="UTF-8">
-<meta name="viewport" content="width=device-width, initial-scale=1">
-<title>{title}</title>
-<style>body {{ max-width: 680px; margin: 0 auto; padding: 24px; font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif; }}</style>
-</head>
-<body>
-<h1>{title}</h1>
-<div class="markdown-body">{html_body}</div>
-<p style="color:#999;font-size:12px;">fastfish-lite 本地预览 · 微信发布需商业版</p>
-</body>
-</html>"""
-    return HTMLResponse(content=full_html)
+    # 标题为用户输入，需转义；正文本身即 HTML，原样嵌入
+    safe_title = html_escape(title, quote=False)
+    return HTMLResponse(
+        content=_ARTICLE_PREVIEW_TPL % (safe_title, safe_title, html_body),
+        headers={"X-Article-Id": str(article_id)},
+    )
+
+
+@app.get("/api/articles/preview-html/{article_id}", response_class=HTMLResponse)
+def articles_preview_html(article_id: int, _: None = Depends(require_auth)) -> HTMLResponse:
+    """本地 HTML 预览：生成完整 HTML 在浏览器中打开。"""
+    return _article_preview_response(article_id)
+
+
+@app.get("/api/articles/preview-html-by-index/{list_index}", response_class=HTMLResponse)
+def articles_preview_html_by_index(list_index: int, _: None = Depends(require_auth)) -> HTMLResponse:
+    """按可发列表序号预览，省去先取可发列表再取预览的一次往返。响应头 X-Article-Id 为对应文章 id。"""
+    article_id = get_available_article_id(list_index)
+    if article_id is None:
+        raise HTTPException(status_code=404, detail=f"list_index {list_index} 无效")
+    return _article_preview_response(article_id)
 
 
 @app.post("/api/articles/ingest")
@@ -8,7 +8,6 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from functools import lru_cache
 from pathlib import Path
 
 _project_root = Path(__file__).resolve().parent
@@ -51,9 +50,20 @@ def _int_from_env(name: str, default: int) -> int:
         return default
 
 
-@lru_cache(maxsize=1)
+_SETTINGS: Settings | None = None
+
+
 def get_settings() -> Settings:
-    """读取配置并缓存。"""
+    """读取配置并缓存（进程内单例）。"""
+    global _SETTINGS
+    s = _SETTINGS
+    if s is None:
+        s = _SETTINGS = _build_settings()
+    return s
+
+
+def _build_settings() -> Settings:
+    """从环境变量构建配置对象。"""
     project_root = Path(__file__).resolve().parent
 
     db_path_env = os.getenv("MEDIA_AGENT_DB_PATH")
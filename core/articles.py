@@ -6,15 +6,34 @@
 
 from __future__ import annotations
 
+import os
 import re
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from core.db import get_connection
 
+# lxml 随 premailer 安装；不可用时 _strip_html 回退到正则
+try:
+    from lxml.html import fromstring as _lxml_fromstring
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 # 可发条件：未分配且标题非空
 _AVAILABLE_SQL = """
-SELECT id, rewritten_title, rewritten_pic, rewritten_content, create_time, format_style, content_format
+SELECT id, rewritten_title, rewritten_content
+FROM hot_article_rewritten
+WHERE allocation_status = 0
+  AND (rewritten_title IS NOT NULL AND TRIM(rewritten_title) != '')
+ORDER BY create_time DESC
+"""
+
+# 与 _AVAILABLE_SQL 条件、排序一致，仅取 id（按序号定位文章时不读正文）
+_AVAILABLE_IDS_SQL = """
+SELECT id
 FROM hot_article_rewritten
 WHERE allocation_status = 0
   AND (rewritten_title IS NOT NULL AND TRIM(rewritten_title) != '')
@@ -27,57 +46,85 @@ FROM hot_article_rewritten
 WHERE id = ?
 """
 
+# 批量接入的渲染线程池（接口本身已在 FastAPI 线程池中运行，不阻塞事件循环）
+_RENDER_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="ingest-render")
+
+_RE_HTML_BLOCK = re.compile(r"<(p|div|h[1-6]|ul|ol|li|blockquote)\b", re.I)
+_RE_STYLE_HEAD = re.compile(r"<(style|head)\b", re.I)
+_RE_TITLE_STYLE_SUFFIX = re.compile(r"\s*\([a-z0-9-]+\s+样式\)\s*$", re.I)
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_WS = re.compile(r"\s+")
+
+
+def _html_to_text(html: str) -> str:
+    if LXML_AVAILABLE:
+        try:
+            return " ".join(_lxml_fromstring(html).text_content().split())
+        except Exception:
+            pass
+    return _RE_WS.sub(" ", _RE_TAG.sub("", html).strip())
+
 
 def _strip_html(html: str | None, max_len: int = 100) -> str:
     if not html:
         return ""
-    text = re.sub(r"<[^>]+>", "", html).strip()
-    text = re.sub(r"\s+", " ", text)
+    text = _html_to_text(html)
     if len(text) > max_len:
         return text[:max_len] + "..."
     return text
 
 
 def get_available_list() -> list[dict[str, Any]]:
+    """返回可发列表，每项含 article_id、list_index（从 1 开始）、title、summary。"""
     with get_connection() as conn:
-        conn.row_factory = _dict_row_factory
         rows = conn.execute(_AVAILABLE_SQL).fetchall()
-    result = []
-    for row in rows:
-        item = dict(row)
-        item["summary"] = _strip_html(item.get("rewritten_content"))
-        result.append(item)
-    return result
+    return [
+        {"article_id": id_, "list_index": i, "title": title or "", "summary": _strip_html(content)}
+        for i, (id_, title, content) in enumerate(rows, start=1)
+    ]
 
 
-def get_article_by_id(article_id: int) -> dict[str, Any] | None:
+def get_available_article_id(list_index: int) -> int | None:
+    """按可发列表序号（从 1 开始）返回 article_id；序号超出列表长度时取最后一篇，无效时返回 None。"""
     with get_connection() as conn:
-        conn.row_factory = _dict_row_factory
-        row = conn.execute(_BY_ID_SQL, (article_id,)).fetchone()
-    return row if row else None
+        ids = [row[0] for row in conn.execute(_AVAILABLE_IDS_SQL)]
+    idx = min(list_index - 1, len(ids) - 1)
+    if idx < 0:
+        return None
+    return ids[idx]
 
 
-def _dict_row_factory(cursor: Any, row: tuple) -> dict[str, Any]:
-    names = [d[0] for d in cursor.description]
-    return dict(zip(names, row))
+def get_article_by_id(article_id: int) -> dict[str, Any] | None:
+    with get_connection() as conn:
+        # 连接按线程复用，row_factory 只设在本次游标上
+        cur = conn.cursor()
+        cur.row_factory = sqlite3.Row
+        row = cur.execute(_BY_ID_SQL, (article_id,)).fetchone()
+    return dict(row) if row else None
 
 
 def _normalize_literal_escapes(text: str) -> str:
     if not text or "\\" not in text:
         return text
-    return text.replace("\\n", "\n").replace("\\r", "\r").replace("\\t", "\t")
+    if "\\n" in text:
+        text = text.replace("\\n", "\n")
+    if "\\r" in text:
+        text = text.replace("\\r", "\r")
+    if "\\t" in text:
+        text = text.replace("\\t", "\t")
+    return text
 
 
 def _detect_content_format(content: str) -> str:
     if not content or not content.strip():
         return "markdown"
     c = content.strip()
-    if re.search(r"<(p|div|h[1-6]|ul|ol|li|blockquote)\b", c, re.I):
+    if _RE_HTML_BLOCK.search(c):
         return "html"
     return "markdown"
 
 
-def ingest_article(
+def _prepare_ingest(
     title: str,
     content: str,
     cover_pic: str | None = None,
@@ -89,12 +136,18 @@ def ingest_article(
     is_markdown: bool = False,
     format_style: str = "minimal",
     auto_format: bool = False,
-) -> dict[str, Any]:
+) -> tuple[dict[str, Any] | None, tuple[tuple, tuple] | None]:
+    """校验并渲染待接入文章，不访问数据库。
+
+    Returns:
+        (error, params)：校验失败时 error 为返回给调用方的结果；
+        否则 params 为 (hot_article 参数, hot_article_rewritten 参数，不含 original_article_id)
+    """
     title = (title or "").strip()
-    title = re.sub(r"\s*\([a-z0-9-]+\s+样式\)\s*$", "", title, flags=re.I)
+    title = _RE_TITLE_STYLE_SUFFIX.sub("", title)
     content = _normalize_literal_escapes((content or "").strip())
     if not title:
-        return {"ok": False, "message": "标题不能为空", "article_id": None}
+        return {"ok": False, "message": "标题不能为空", "article_id": None}, None
     ts = int(time.time())
     cover_pic = (cover_pic or "").strip() or None
     source_url = (source_url or "").strip() or None
@@ -104,12 +157,12 @@ def ingest_article(
     if auto_format:
         is_markdown = _detect_content_format(content) == "markdown"
 
-    if not is_markdown and re.search(r"<(style|head)\b", content, re.I):
+    if not is_markdown and _RE_STYLE_HEAD.search(content):
         return {
             "ok": False,
             "message": "检测到内容为完整 HTML（含 style/head）。请使用 --is-markdown 传入原始 Markdown，由系统在发布时渲染样式。禁止先 render-markdown 再 ingest HTML。",
             "article_id": None,
-        }
+        }, None
 
     if is_markdown:
         content_to_store = content
@@ -121,49 +174,105 @@ def ingest_article(
         content_format = "html"
         content_html = content
 
+    article_params = (task_id, category_id, title, cover_pic, content_html, source_url,
+                      title, cover_pic, content_html, ts, ts)
+    rewritten_params = (task_id, category_id, title, cover_pic, content_to_store, author, digest,
+                        format_style, content_format, ts, ts, source_url)
+    return None, (article_params, rewritten_params)
+
+
+_INSERT_HOT_ARTICLE_SQL = """
+INSERT INTO hot_article
+(task_id, category_id, source_title, source_pic, source_content, source_url,
+ rewritten_title, rewritten_pic, rewritten_content, allocation_status,
+ create_time, update_time)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+"""
+
+_INSERT_REWRITTEN_SQL = """
+INSERT INTO hot_article_rewritten
+(original_article_id, task_id, category_id, rewritten_title, rewritten_pic, rewritten_content,
+ author, digest, allocation_status, format_style, content_format,
+ create_time, update_time, source_url)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?)
+"""
+
+
+def _insert_prepared(conn: Any, article_params: tuple, rewritten_params: tuple) -> int:
+    """写入 hot_article 与 hot_article_rewritten，返回 rewritten id。"""
+    orig_id = conn.execute(_INSERT_HOT_ARTICLE_SQL, article_params).lastrowid
+    return conn.execute(_INSERT_REWRITTEN_SQL, (orig_id, *rewritten_params)).lastrowid
+
+
+def ingest_article(
+    title: str,
+    content: str,
+    cover_pic: str | None = None,
+    source_url: str | None = None,
+    task_id: int = 0,
+    category_id: int = 0,
+    author: str | None = None,
+    summary: str | None = None,
+    is_markdown: bool = False,
+    format_style: str = "minimal",
+    auto_format: bool = False,
+) -> dict[str, Any]:
+    error, params = _prepare_ingest(
+        title, content, cover_pic, source_url, task_id, category_id,
+        author, summary, is_markdown, format_style, auto_format,
+    )
+    if error:
+        return error
     try:
         with get_connection() as conn:
-            conn.execute(
-                """INSERT INTO hot_article
-                   (task_id, category_id, source_title, source_pic, source_content, source_url,
-                    rewritten_title, rewritten_pic, rewritten_content, allocation_status,
-                    create_time, update_time)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)""",
-                (task_id, category_id, title, cover_pic, content_html, source_url, title, cover_pic, content_html, ts, ts),
-            )
-            orig_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-            conn.execute(
-                """INSERT INTO hot_article_rewritten
-                   (original_article_id, task_id, category_id, rewritten_title, rewritten_pic, rewritten_content,
-                    author, digest, allocation_status, format_style, content_format,
-                    create_time, update_time, source_url)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?)""",
-                (orig_id, task_id, category_id, title, cover_pic, content_to_store, author, digest,
-                 format_style, content_format, ts, ts, source_url),
-            )
-            rewritten_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            rewritten_id = _insert_prepared(conn, *params)
         return {"ok": True, "message": "已接入，已加入可发列表", "article_id": rewritten_id}
     except Exception as e:
         return {"ok": False, "message": str(e), "article_id": None}
 
 
+def _prepare_batch_item(item: dict[str, Any]) -> tuple[dict[str, Any] | None, tuple[tuple, tuple] | None]:
+    return _prepare_ingest(
+        title=item.get("title") or "",
+        content=item.get("content") or "",
+        cover_pic=item.get("cover_pic"),
+        source_url=item.get("source_url"),
+        task_id=int(item.get("task_id") or 0),
+        category_id=int(item.get("category_id") or 0),
+        author=item.get("author"),
+        summary=item.get("summary"),
+        is_markdown=bool(item.get("is_markdown", False)),
+        format_style=str(item.get("format_style") or "minimal"),
+        auto_format=bool(item.get("auto_format", False)),
+    )
+
+
 def ingest_articles_batch(articles: list[dict[str, Any]]) -> dict[str, Any]:
-    results: list[dict[str, Any]] = []
-    for item in articles:
-        r = ingest_article(
-            title=item.get("title") or "",
-            content=item.get("content") or "",
-            cover_pic=item.get("cover_pic"),
-            source_url=item.get("source_url"),
-            task_id=int(item.get("task_id") or 0),
-            category_id=int(item.get("category_id") or 0),
-            author=item.get("author"),
-            summary=item.get("summary"),
-            is_markdown=bool(item.get("is_markdown", False)),
-            format_style=str(item.get("format_style") or "minimal"),
-            auto_format=bool(item.get("auto_format", False)),
-        )
-        results.append(r)
+    """批量接入：先并行校验渲染，再在同一事务中写入（每条一个 SAVEPOINT，失败互不影响）。"""
+    if len(articles) > 1:
+        prepared = list(_RENDER_POOL.map(_prepare_batch_item, articles))
+    else:
+        prepared = [_prepare_batch_item(item) for item in articles]
+    results: list[dict[str, Any]] = [error or {} for error, _ in prepared]
+    pending = [(i, params) for i, (error, params) in enumerate(prepared) if not error]
+    if pending:
+        try:
+            with get_connection() as conn:
+                conn.execute("BEGIN")
+                for i, params in pending:
+                    conn.execute("SAVEPOINT ingest_item")
+                    try:
+                        rewritten_id = _insert_prepared(conn, *params)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO ingest_item")
+                        conn.execute("RELEASE ingest_item")
+                        results[i] = {"ok": False, "message": str(e), "article_id": None}
+                        continue
+                    conn.execute("RELEASE ingest_item")
+                    results[i] = {"ok": True, "message": "已接入，已加入可发列表", "article_id": rewritten_id}
+        except Exception as e:
+            for i, _ in pending:
+                results[i] = {"ok": False, "message": str(e), "article_id": None}
     success_count = sum(1 for r in results if r.get("ok"))
     return {
         "ok": success_count == len(articles) if articles else True,
@@ -173,6 +282,13 @@ def ingest_articles_batch(articles: list[dict[str, Any]]) -> dict[str, Any]:
     }
 
 
+_UPDATE_STATE_SQL = """
+SELECT format_style, content_format, published_count, original_article_id
+FROM hot_article_rewritten
+WHERE id = ?
+"""
+
+
 def update_article(
     article_id: int,
     title: str | None = None,
@@ -181,24 +297,39 @@ def update_article(
     is_markdown: bool = False,
     format_style: str | None = None,
 ) -> dict[str, Any]:
-    article = get_article_by_id(article_id)
-    if not article:
-        return {"ok": False, "message": f"文章不存在: article_id={article_id}", "article_id": None}
+    try:
+        with get_connection() as conn:
+            row = conn.execute(_UPDATE_STATE_SQL, (article_id,)).fetchone()
+            if not row:
+                return {"ok": False, "message": f"文章不存在: article_id={article_id}", "article_id": None}
+            return _apply_article_update(
+                conn, article_id, row, title, content, cover_pic, is_markdown, format_style,
+            )
+    except Exception as e:
+        return {"ok": False, "message": f"更新失败: {str(e)}", "article_id": None}
 
-    current_format_style = article.get("format_style") or "minimal"
-    current_content_format = article.get("content_format") or "html"
 
-    with get_connection() as conn:
-        row = conn.execute(
-            "SELECT published_count FROM hot_article_rewritten WHERE id = ?",
-            (article_id,),
-        ).fetchone()
-        if row and row[0] and row[0] > 0:
-            return {
-                "ok": False,
-                "message": f"文章已发布（published_count={row[0]}），不允许更新: article_id={article_id}",
-                "article_id": None,
-            }
+def _apply_article_update(
+    conn: Any,
+    article_id: int,
+    row: tuple,
+    title: str | None,
+    content: str | None,
+    cover_pic: str | None,
+    is_markdown: bool,
+    format_style: str | None,
+) -> dict[str, Any]:
+    """在 update_article 的连接内校验参数并写入 hot_article_rewritten / hot_article。"""
+    current_format_style = row[0] or "minimal"
+    current_content_format = row[1] or "html"
+    published_count = row[2]
+    orig_id = row[3]
+    if published_count and published_count > 0:
+        return {
+            "ok": False,
+            "message": f"文章已发布（published_count={published_count}），不允许更新: article_id={article_id}",
+            "article_id": None,
+        }
 
     target_format_style = format_style if format_style is not None else current_format_style
     updates: list[str] = []
@@ -207,7 +338,7 @@ def update_article(
     content_format_to_set = current_content_format
 
     if title is not None:
-        title = re.sub(r"\s*\([a-z0-9-]+\s+样式\)\s*$", "", title.strip(), flags=re.I)
+        title = _RE_TITLE_STYLE_SUFFIX.sub("", title.strip())
         if not title:
             return {"ok": False, "message": "标题不能为空", "article_id": None}
         updates.append("rewritten_title = ?")
@@ -215,7 +346,7 @@ def update_article(
 
     if content is not None:
         content = _normalize_literal_escapes(content.strip())
-        if not is_markdown and re.search(r"<(style|head)\b", content, re.I):
+        if not is_markdown and _RE_STYLE_HEAD.search(content):
             return {
                 "ok": False,
                 "message": "检测到内容为完整 HTML（含 style/head）。请使用 --is-markdown 传入原始 Markdown。",
@@ -256,52 +387,43 @@ def update_article(
     if not updates:
         return {"ok": False, "message": "没有提供要更新的字段", "article_id": None}
 
+    # 渲染在第一条 UPDATE 之前完成：此前只有 SELECT，尚未开启写事务
+    content_html = content
+    if content is not None and content_format_to_set == "markdown" and content:
+        from core.render import render_markdown_to_html
+        content_html = render_markdown_to_html(content, format_style=target_format_style)
+
     updates.append("update_time = ?")
     values.append(ts)
+    values.append(article_id)
+    sql = f"UPDATE hot_article_rewritten SET {', '.join(updates)} WHERE id = ?"
+    conn.execute(sql, values)
 
-    try:
-        with get_connection() as conn:
-            values.append(article_id)
-            sql = f"UPDATE hot_article_rewritten SET {', '.join(updates)} WHERE id = ?"
-            conn.execute(sql, values)
-
-            article_updates: list[str] = []
-            article_values: list[Any] = []
-            if title is not None:
-                article_updates.append("rewritten_title = ?")
-                article_values.append(title)
-            if content is not None:
-                if content_format_to_set == "markdown" and content:
-                    from core.render import render_markdown_to_html
-                    content_html = render_markdown_to_html(content, format_style=target_format_style)
-                else:
-                    content_html = content
-                article_updates.append("rewritten_content = ?")
-                article_values.append(content_html)
-            if cover_pic is not None:
-                article_updates.append("rewritten_pic = ?")
-                article_values.append(cover_pic)
-
-            if article_updates:
-                article_updates.append("update_time = ?")
-                article_values.append(ts)
-                orig_id_row = conn.execute(
-                    "SELECT original_article_id FROM hot_article_rewritten WHERE id = ?",
-                    (article_id,),
-                ).fetchone()
-                if orig_id_row:
-                    orig_id = orig_id_row[0]
-                    article_values.append(orig_id)
-                    article_sql = f"UPDATE hot_article SET {', '.join(article_updates)} WHERE id = ?"
-                    conn.execute(article_sql, article_values)
-
-        return {"ok": True, "message": "文章已更新", "article_id": article_id}
-    except Exception as e:
-        return {"ok": False, "message": f"更新失败: {str(e)}", "article_id": None}
+    article_updates: list[str] = []
+    article_values: list[Any] = []
+    if title is not None:
+        article_updates.append("rewritten_title = ?")
+        article_values.append(title)
+    if content is not None:
+        article_updates.append("rewritten_content = ?")
+        article_values.append(content_html)
+    if cover_pic is not None:
+        article_updates.append("rewritten_pic = ?")
+        article_values.append(cover_pic)
+
+    if article_updates:
+        article_updates.append("update_time = ?")
+        article_values.append(ts)
+        article_values.append(orig_id)
+        article_sql = f"UPDATE hot_article SET {', '.join(article_updates)} WHERE id = ?"
+        conn.execute(article_sql, article_values)
+
+    return {"ok": True, "message": "文章已更新", "article_id": article_id}
 
 
 __all__ = [
     "get_available_list",
+    "get_available_article_id",
     "get_article_by_id",
     "ingest_article",
     "ingest_articles_batch",
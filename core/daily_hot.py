@@ -14,30 +14,131 @@ import json
 import logging
 import os
 import time
-from typing import Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
 from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from core.db import get_connection
+from core.db import create_hot_items_raw_table, get_connection
+
+# orjson 可选（C 实现，更快）；不可用时回退标准库 json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# pyahocorasick 可选；不可用时关键词匹配回退到逐词子串查找
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 _HOT_API_BASE = os.getenv("HOT_API_BASE", "https://api.pearktrue.cn").rstrip("/")
 _REQUEST_TIMEOUT = 15
+_FETCH_MAX_WORKERS = 16
+_PUSH_MAX_WORKERS = 8  # 并发推送上限，避免同一 IM 平台的机器人接口触发限流
+_PUSH_TIMEOUT = (5, 10)  # 推送请求 (连接, 读取) 超时（秒）；推送不重试，单条最长约 15 秒
+
+# 推送历史 status：失败可在下次定时任务重推；结果未知（请求已发出但未收到响应）视同已推送，避免重复消息
+PUSH_STATUS_FAILED = 0
+PUSH_STATUS_OK = 1
+PUSH_STATUS_UNKNOWN = 2
+_PLATFORMS_TTL = 3600  # 平台列表进程内缓存时长（秒）
+_PLATFORMS_FILE_TTL = 86400  # 平台列表磁盘缓存时长（秒），跨进程复用，定时任务无需每次请求
+_PLATFORMS_CACHE_PATH = (
+    Path(os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache") / "fastfish" / "platforms.json"
+)
+
+# 模块级 Session：复用 TCP/TLS 连接，多平台并发拉取共享连接池
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.3),
+)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# 推送专用 Session：POST 非幂等，不自动重试，避免 webhook 已收到却重发
+_PUSH_SESSION = requests.Session()
+_push_adapter = HTTPAdapter(pool_connections=_PUSH_MAX_WORKERS, pool_maxsize=_PUSH_MAX_WORKERS, max_retries=0)
+_PUSH_SESSION.mount("https://", _push_adapter)
+_PUSH_SESSION.mount("http://", _push_adapter)
 
 
 def fetch_platforms() -> list[str]:
     """从 api.pearktrue.cn 获取支持的平台列表（约 45 个）。
 
+    结果按整点小时分桶缓存于进程内（最长 1 小时），并写入磁盘缓存供后续进程复用（24 小时）；
+    拉取失败不缓存，下次调用重试。
+
     Returns:
         平台名列表，如 ['微博', '知乎', '百度贴吧', ...]
     """
+    platforms = _fetch_platforms_cached(int(time.time() // _PLATFORMS_TTL))
+    if not platforms:
+        _fetch_platforms_cached.cache_clear()
+    return list(platforms)
+
+
+@lru_cache(maxsize=1)
+def _fetch_platforms_cached(bucket: int) -> tuple[str, ...]:
+    """bucket 为时间分桶编号，仅用作缓存键，变化即失效。进程内未命中时先读磁盘缓存。"""
+    platforms = _load_platforms_file()
+    if platforms is None:
+        platforms = _fetch_platforms_raw()
+        if platforms:
+            _save_platforms_file(platforms)
+    return tuple(platforms)
+
+
+def _load_platforms_file() -> list[str] | None:
+    """读取磁盘上的平台列表缓存；不存在、过期或损坏时返回 None。"""
+    try:
+        if _PLATFORMS_CACHE_PATH.stat().st_mtime < time.time() - _PLATFORMS_FILE_TTL:
+            return None
+        platforms = _json_loads(_PLATFORMS_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if isinstance(platforms, list) and platforms and all(isinstance(p, str) for p in platforms):
+        return platforms
+    return None
+
+
+def _save_platforms_file(platforms: list[str]) -> None:
+    """写入平台列表缓存（临时文件 + 原子替换）。"""
+    tmp = _PLATFORMS_CACHE_PATH.with_name(f"{_PLATFORMS_CACHE_PATH.name}.{os.getpid()}.tmp")
+    try:
+        _PLATFORMS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(_json_dumps(platforms), encoding="utf-8")
+        os.replace(tmp, _PLATFORMS_CACHE_PATH)
+    except OSError as e:
+        logger.warning("写入平台列表缓存失败: %s", e)
+        tmp.unlink(missing_ok=True)
+
+
+def _fetch_platforms_raw() -> list[str]:
+    """请求平台列表接口（不缓存）。"""
     url = f"{_HOT_API_BASE}/api/dailyhot/"
     try:
-        r = requests.get(url, timeout=_REQUEST_TIMEOUT)
+        r = _SESSION.get(url, timeout=_REQUEST_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
+        data = _json_loads(r.content)
     except requests.RequestException as e:
         logger.warning("拉取平台列表失败: %s", e)
         return []
@@ -55,6 +156,9 @@ def fetch_platforms() -> list[str]:
     return []
 
 
+fetch_platforms.cache_clear = _fetch_platforms_cached.cache_clear  # type: ignore[attr-defined]
+
+
 def fetch_from_pearktrue(source: str) -> list[dict[str, Any]]:
     """从 api.pearktrue.cn 拉取指定平台的热点数据。
 
@@ -66,9 +170,9 @@ def fetch_from_pearktrue(source: str) -> list[dict[str, Any]]:
     """
     url = f"{_HOT_API_BASE}/api/dailyhot/"
     try:
-        r = requests.get(url, params={"title": source}, timeout=_REQUEST_TIMEOUT)
+        r = _SESSION.get(url, params={"title": source}, timeout=_REQUEST_TIMEOUT)
         r.raise_for_status()
-        data = r.json()
+        data = _json_loads(r.content)
     except requests.RequestException as e:
         logger.warning("拉取热点失败 source=%s: %s", source, e)
         return []
@@ -85,25 +189,54 @@ def fetch_from_pearktrue(source: str) -> list[dict[str, Any]]:
     if not isinstance(items, list):
         return []
 
-    result = []
-    for i, item in enumerate(items):
+    result: list[dict[str, Any]] = []
+    append = result.append
+    for rank, item in enumerate(items, 1):
         if not isinstance(item, dict):
             continue
-        title = item.get("title") or item.get("name") or ""
-        link = item.get("mobileUrl") or item.get("url") or item.get("link") or ""
-        desc = item.get("desc") or ""
-        hot = str(item.get("hot", "")) if item.get("hot") is not None else ""
-        if title:
-            result.append({
-                "title": title,
-                "link": link,
-                "desc": desc,
-                "hot": hot,
-                "rank": i + 1,
-            })
+        get = item.get
+        title = get("title") or get("name")
+        if not title:
+            continue
+        hot = get("hot")
+        append({
+            "title": title,
+            "link": get("mobileUrl") or get("url") or get("link") or "",
+            "desc": get("desc") or "",
+            "hot": "" if hot is None else str(hot),
+            "rank": rank,
+        })
     return result
 
 
+def fetch_many(sources: list[str]) -> dict[str, list[dict[str, Any]]]:
+    """并发拉取多个平台的热点。
+
+    Returns:
+        {source: 热点列表}，顺序与 sources 一致；失败平台对应空列表
+    """
+    if not sources:
+        return {}
+    workers = min(_FETCH_MAX_WORKERS, len(sources))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        results = ex.map(fetch_from_pearktrue, sources)
+        return dict(zip(sources, results))
+
+
+def iter_fetch_many(sources: list[str]) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    """并发拉取多个平台的热点，按完成先后逐个产出 (source, 热点列表)。
+
+    调用方可在其余平台仍在拉取时处理已返回的结果（如写库）；失败平台对应空列表。
+    """
+    if not sources:
+        return
+    workers = min(_FETCH_MAX_WORKERS, len(sources))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = {ex.submit(fetch_from_pearktrue, source): source for source in sources}
+        for fut in as_completed(futures):
+            yield futures[fut], fut.result()
+
+
 def delete_raw_items_before(cutoff_ts: int) -> int:
     """删除 fetched_at 早于 cutoff_ts 的 raw 数据，用于定期清理历史。
 
@@ -118,61 +251,122 @@ def delete_raw_items_before(cutoff_ts: int) -> int:
 def delete_all_raw_items() -> int:
     """清空 hot_items_raw 表全部数据（每次拉取前调用）。
 
+    以 DROP + CREATE 重建整表，整页释放而非逐行删除；保留 AUTOINCREMENT 序号，
+    避免推送历史中的 item_ids 与新数据 id 重复。
+
     Returns:
         删除条数
     """
     with get_connection() as conn:
-        cur = conn.execute("DELETE FROM hot_items_raw")
-        return cur.rowcount
+        count = conn.execute("SELECT COUNT(*) FROM hot_items_raw").fetchone()[0]
+        if not count:
+            return 0
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'hot_items_raw'").fetchone()
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("DROP TABLE hot_items_raw")
+        create_hot_items_raw_table(conn)
+        if row:
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('hot_items_raw', ?)", (row[0],)
+            )
+        return count
+
+
+_INSERT_RAW_SQL = """
+INSERT INTO hot_items_raw
+(source, title, link, desc_text, hot, rank, fetched_at, create_time)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _raw_rows(source: str, items: list[dict], fetched_at: int, ts: int) -> Iterator[tuple]:
+    for item in items:
+        yield (
+            source,
+            item.get("title", ""),
+            item.get("link", ""),
+            item.get("desc", ""),
+            item.get("hot", ""),
+            item.get("rank", 0),
+            fetched_at,
+            ts,
+        )
 
 
 def save_raw_items(source: str, items: list[dict], fetched_at: int) -> int:
-    """将拉取的热点写入 hot_items_raw 表。
+    """将拉取的热点写入 hot_items_raw 表（单事务 executemany）。
+
+    Returns:
+        写入条数
+    """
+    if not items:
+        return 0
+    return save_raw_items_many({source: items}, fetched_at)
+
+
+def save_raw_items_many(fetched: dict[str, list[dict]], fetched_at: int) -> int:
+    """将多个平台的热点一次 executemany 写入 hot_items_raw，整批只提交一次。
+
+    Args:
+        fetched: {source: 热点列表}
 
     Returns:
         写入条数
     """
     ts = int(time.time())
-    count = 0
+    rows = [row for source, items in fetched.items() for row in _raw_rows(source, items, fetched_at, ts)]
+    if not rows:
+        return 0
     with get_connection() as conn:
-        for item in items:
-            conn.execute(
-                """INSERT INTO hot_items_raw
-                   (source, title, link, desc_text, hot, rank, fetched_at, create_time)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    source,
-                    item.get("title", ""),
-                    item.get("link", ""),
-                    item.get("desc", ""),
-                    item.get("hot", ""),
-                    item.get("rank", 0),
-                    fetched_at,
-                    ts,
-                ),
-            )
-            count += 1
-    return count
+        conn.executemany(_INSERT_RAW_SQL, rows)
+    return len(rows)
+
+
+_PUSH_CONFIGS_SQL = """
+SELECT id, category_code, category_name, sources, include_keywords,
+       exclude_keywords, push_time, im_channel, webhook_url, max_items
+FROM hot_push_config WHERE is_active = 1
+"""
+
+# openclaw 占位配置（由 OpenClaw Cron 推送）
+_NOT_OPENCLAW_CLAUSE = (
+    " AND LOWER(COALESCE(im_channel, '')) != 'openclaw'"
+    " AND substr(TRIM(COALESCE(webhook_url, '')), 1, 11) != 'openclaw://'"
+)
+# push_time 为空（不限时间）或包含当前 HH:MM；精确匹配仍由调用方完成
+_PUSH_TIME_CLAUSE = (
+    " AND (REPLACE(REPLACE(COALESCE(push_time, ''), ',', ''), ' ', '') = ''"
+    " OR instr(push_time, ?) > 0)"
+)
 
 
-def get_push_configs() -> list[dict[str, Any]]:
-    """获取所有启用的推送配置。"""
+def get_push_configs(current_time: str | None = None, include_openclaw: bool = True) -> list[dict[str, Any]]:
+    """获取所有启用的推送配置。
+
+    Args:
+        current_time: 给出 HH:MM 时，在 SQL 中预先排除 push_time 不可能匹配的配置
+        include_openclaw: 为 False 时在 SQL 中排除 openclaw 占位配置
+    """
+    sql = _PUSH_CONFIGS_SQL
+    params: list[str] = []
+    if not include_openclaw:
+        sql += _NOT_OPENCLAW_CLAUSE
+    if current_time:
+        sql += _PUSH_TIME_CLAUSE
+        params.append(current_time)
     with get_connection() as conn:
-        cur = conn.execute(
-            """SELECT id, category_code, category_name, sources, include_keywords,
-                      exclude_keywords, push_time, im_channel, webhook_url, max_items
-               FROM hot_push_config WHERE is_active = 1"""
-        )
-        rows = cur.fetchall()
+        cur = conn.execute(sql, params)
+    rows = cur.fetchall()
     configs = []
     for row in rows:
         configs.append({
             "id": row[0],
             "category_code": row[1],
             "category_name": row[2],
-            "sources": json.loads(row[3]) if row[3] else [],
-            "include_keywords": json.loads(row[4]) if row[4] else [],
-            "exclude_keywords": json.loads(row[5]) if row[5] else [],
+            "sources": _json_loads(row[3]) if row[3] else [],
+            "include_keywords": _json_loads(row[4]) if row[4] else [],
+            "exclude_keywords": _json_loads(row[5]) if row[5] else [],
             "push_time": row[6],
             "im_channel": row[7],
             "webhook_url": row[8],
@@ -181,13 +375,30 @@ def get_push_configs() -> list[dict[str, Any]]:
     return configs
 
 
-def _match_keywords(text: str, keywords: list[str]) -> bool:
-    """检查文本是否包含任一关键词（不区分大小写）。"""
-    if not keywords:
-        return False
-    lower = (text or "").lower()
+@lru_cache(maxsize=128)
+def _build_ac(keywords: tuple[str, ...]) -> Any:
+    """按已小写的关键词元组构建 Aho-Corasick 自动机，结果缓存。"""
+    automaton = ahocorasick.Automaton()
     for kw in keywords:
-        if kw and kw.lower() in lower:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def _lower_keywords(keywords: list[str]) -> tuple[str, ...]:
+    """关键词去空并统一小写，每个配置只算一次。"""
+    return tuple(kw.lower() for kw in keywords if kw)
+
+
+def _match_keywords(texts_lower: tuple[str, ...], keywords_lower: tuple[str, ...]) -> bool:
+    """检查任一已小写文本是否包含任一已小写关键词，命中即返回。"""
+    if not keywords_lower:
+        return False
+    if AHOCORASICK_AVAILABLE:
+        automaton = _build_ac(keywords_lower)
+        return any(next(automaton.iter(text), None) is not None for text in texts_lower if text)
+    for text in texts_lower:
+        if text and any(kw in text for kw in keywords_lower):
             return True
     return False
 
@@ -197,26 +408,34 @@ def filter_items(
     include_keywords: list[str],
     exclude_keywords: list[str],
 ) -> list[dict]:
-    """按关键词过滤热点。
+    """按关键词过滤热点（不区分大小写，title、desc 分别匹配）。
 
     规则：先排除含 exclude 的，再按 include 筛选（若 include 非空）。
     """
+    inc_low = _lower_keywords(include_keywords or [])
+    exc_low = _lower_keywords(exclude_keywords or [])
+    if not inc_low and not exc_low:
+        return list(items)
     filtered = []
     for item in items:
-        title = item.get("title", "") or ""
-        desc = item.get("desc", "") or ""
-        text = f"{title} {desc}"
+        texts = (
+            (item.get("title", "") or "").lower(),
+            (item.get("desc", "") or "").lower(),
+        )
 
-        if exclude_keywords and _match_keywords(text, exclude_keywords):
+        if exc_low and _match_keywords(texts, exc_low):
             continue
-        if include_keywords and not _match_keywords(text, include_keywords):
+        if inc_low and not _match_keywords(texts, inc_low):
             continue
         filtered.append(item)
     return filtered
 
 
 def get_today_raw_items(sources: list[str]) -> list[dict]:
-    """获取今日拉取的 raw 数据。sources 为空时取全部平台，否则按 source 过滤。"""
+    """获取今日拉取的 raw 数据。sources 为空时取全部平台，否则按 source 过滤。
+
+    按 (source, rank) 排序，不按 link 去重：须先按关键词过滤再去重，见 filter_and_dedupe。
+    """
     ts = int(time.time())
     today_start = ts - (ts % 86400) - 8 * 3600  # 当日 0 点（东八区近似）
     today_end = today_start + 86400
@@ -254,53 +473,78 @@ def get_today_raw_items(sources: list[str]) -> list[dict]:
     return items
 
 
+def _source_rank(item: dict) -> tuple:
+    return (item.get("source", ""), item.get("rank", 999))
+
+
+def filter_and_dedupe(
+    items: list[dict],
+    include_keywords: list[str],
+    exclude_keywords: list[str],
+) -> list[dict]:
+    """先按关键词过滤，再按 link 去重（保留 rank 最小的），结果按 (source, rank) 排序。
+
+    顺序不可颠倒：同一 link 的多条中可能只有 rank 较大的一条命中关键词，先去重会丢掉该 link。
+    """
+    items = _dedupe_by_link(filter_items(items, include_keywords, exclude_keywords))
+    items.sort(key=_source_rank)
+    return items
+
+
 def _dedupe_by_link(items: list[dict]) -> list[dict]:
-    """按 link 去重，保留 rank 最小的。"""
-    seen = {}
+    """按 link 去重，保留 rank 最小的。
+
+    以 link 为键的 dict 单次遍历，O(n)；结果按各 link 首次出现的顺序排列。
+    """
+    best: dict[str, dict] = {}
     for item in items:
         link = (item.get("link") or "").strip()
         if not link:
             continue
-        if link not in seen or (item.get("rank", 999) < seen[link].get("rank", 999)):
-            seen[link] = item
-    return list(seen.values())
+        kept = best.setdefault(link, item)
+        if kept is not item and item.get("rank", 999) < kept.get("rank", 999):
+            best[link] = item
+    return list(best.values())
 
 
 def format_push_message(items: list[dict], category_name: str) -> str:
-    """格式化推送消息文本。"""
-    from datetime import datetime
+    """格式化推送消息文本（最多 20 条）。"""
     date_str = datetime.now().strftime("%Y-%m-%d")
     lines = [f"【{category_name}】今日热点 {date_str}", ""]
-    for i, item in enumerate(items[:20], 1):  # 最多 20 条
-        title = (item.get("title") or "").strip()
-        link = (item.get("link") or "").strip()
-        source = item.get("source", "")
-        if title:
-            lines.append(f"{i}. [{source}] {title}")
-            if link:
-                lines.append(f"   {link}")
-            lines.append("")
-    return "\n".join(lines).strip()
+    numbered = (
+        ((item.get("title") or "").strip(), (item.get("link") or "").strip(), item.get("source", ""))
+        for item in items[:20]
+    )
+    for i, (title, link, source) in enumerate(numbered, 1):
+        if not title:
+            continue
+        lines.append(f"{i}. [{source}] {title}")
+        if link:
+            lines.append(f"   {link}")
+        lines.append("")
+    return "\n".join(lines).rstrip()
 
 
-def push_to_feishu(webhook_url: str, content: str) -> tuple[bool, str]:
+def push_to_feishu(webhook_url: str, content: str) -> tuple[bool | None, str]:
     """推送到飞书 Webhook。
 
     Returns:
-        (成功与否, 错误信息)
+        (成功与否, 错误信息)；已发出但读取响应超时返回 (None, 错误信息)，表示结果未知
     """
     if not webhook_url or not webhook_url.strip():
         return False, "webhook_url 为空"
     try:
-        r = requests.post(
+        r = _PUSH_SESSION.post(
             webhook_url.strip(),
             json={"msg_type": "text", "content": {"text": content}},
-            timeout=10,
+            timeout=_PUSH_TIMEOUT,
         )
-        resp = r.json()
+        resp = _json_loads(r.content)
         if resp.get("code") != 0 and resp.get("StatusCode") != 0:
             return False, resp.get("msg", resp.get("message", str(resp)))
         return True, ""
+    except requests.ReadTimeout as e:
+        return None, f"响应超时，可能已送达: {e}"
     except requests.RequestException as e:
         return False, str(e)
     except json.JSONDecodeError:
@@ -318,11 +562,11 @@ def _dingtalk_signed_url(base_url: str, secret: str) -> str:
     return f"{base_url}{sep}{urlencode({'timestamp': timestamp, 'sign': sign})}"
 
 
-def push_to_dingtalk(webhook_url: str, content: str) -> tuple[bool, str]:
+def push_to_dingtalk(webhook_url: str, content: str) -> tuple[bool | None, str]:
     """推送到钉钉 Webhook。支持加签：若配置 HOT_PUSH_DINGTALK_SECRET，每次推送动态生成签名。
 
     Returns:
-        (成功与否, 错误信息)
+        (成功与否, 错误信息)；已发出但读取响应超时返回 (None, 错误信息)，表示结果未知
     """
     if not webhook_url or not webhook_url.strip():
         return False, "webhook_url 为空"
@@ -331,28 +575,30 @@ def push_to_dingtalk(webhook_url: str, content: str) -> tuple[bool, str]:
     if secret:
         url = _dingtalk_signed_url(url, secret)
     try:
-        r = requests.post(
+        r = _PUSH_SESSION.post(
             url,
             json={"msgtype": "text", "text": {"content": content}},
-            timeout=10,
+            timeout=_PUSH_TIMEOUT,
         )
-        resp = r.json()
+        resp = _json_loads(r.content)
         if resp.get("errcode") != 0:
             return False, resp.get("errmsg", str(resp))
         return True, ""
+    except requests.ReadTimeout as e:
+        return None, f"响应超时，可能已送达: {e}"
     except requests.RequestException as e:
         return False, str(e)
     except json.JSONDecodeError:
         return False, "响应非 JSON"
 
 
-def push_to_telegram(bot_token: str, chat_id: str, content: str) -> tuple[bool, str]:
+def push_to_telegram(bot_token: str, chat_id: str, content: str) -> tuple[bool | None, str]:
     """推送到 Telegram Bot API。
 
     webhook_url 存 chat_id，bot_token 从环境变量 HOT_PUSH_TELEGRAM_BOT_TOKEN 读取。
 
     Returns:
-        (成功与否, 错误信息)
+        (成功与否, 错误信息)；已发出但读取响应超时返回 (None, 错误信息)，表示结果未知
     """
     if not bot_token or not bot_token.strip():
         return False, "HOT_PUSH_TELEGRAM_BOT_TOKEN 未配置"
@@ -360,67 +606,118 @@ def push_to_telegram(bot_token: str, chat_id: str, content: str) -> tuple[bool,
         return False, "chat_id 为空"
     url = f"https://api.telegram.org/bot{bot_token.strip()}/sendMessage"
     try:
-        r = requests.post(
+        r = _PUSH_SESSION.post(
             url,
             json={"chat_id": chat_id.strip(), "text": content},
-            timeout=10,
+            timeout=_PUSH_TIMEOUT,
         )
-        resp = r.json()
+        resp = _json_loads(r.content)
         if not resp.get("ok"):
             return False, resp.get("description", str(resp))
         return True, ""
+    except requests.ReadTimeout as e:
+        return None, f"响应超时，可能已送达: {e}"
     except requests.RequestException as e:
         return False, str(e)
     except json.JSONDecodeError:
         return False, "响应非 JSON"
 
 
-def push_to_im(im_channel: str, webhook_url: str, content: str) -> tuple[bool, str]:
-    """根据 im_channel 选择推送方式。telegram 时 webhook_url 存 chat_id。"""
+def push_to_im(im_channel: str, webhook_url: str, content: str) -> tuple[bool | None, str]:
+    """根据 im_channel 选择推送方式。telegram 时 webhook_url 存 chat_id。
+
+    成功与否为 None 表示请求已发出但未收到响应，结果未知。
+    """
     ch = (im_channel or "").lower()
     if ch == "feishu":
         return push_to_feishu(webhook_url, content)
     if ch == "dingtalk":
         return push_to_dingtalk(webhook_url, content)
     if ch == "telegram":
-        import os
         token = os.getenv("HOT_PUSH_TELEGRAM_BOT_TOKEN", "").strip()
         return push_to_telegram(token, webhook_url, content)
     return False, f"不支持的 im_channel: {im_channel}"
 
 
-def already_pushed_today(config_id: int) -> bool:
-    """检查该 config 今日是否已推送。"""
+def push_batch(jobs: list[tuple[str, str, str]]) -> list[tuple[bool | None, str]]:
+    """并发推送多条消息。
+
+    每条推送由请求超时限定耗时（不重试），排队中的推送不会被取消，等待全部完成。
+
+    Args:
+        jobs: [(im_channel, webhook_url, content), ...]
+
+    Returns:
+        与 jobs 顺序一致的 (成功与否, 错误信息) 列表，成功与否为 None 表示结果未知
+    """
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=min(_PUSH_MAX_WORKERS, len(jobs))) as ex:
+        return list(ex.map(lambda job: push_to_im(*job), jobs))
+
+
+_PUSHED_PROBE_SQL = """
+SELECT 1 FROM hot_push_history
+WHERE config_id = ? AND pushed_at >= ? AND pushed_at < ? AND status != 0
+LIMIT 1
+"""
+
+_PUSHED_CONFIG_IDS_SQL = """
+SELECT DISTINCT config_id FROM hot_push_history
+WHERE pushed_at >= ? AND pushed_at < ? AND status != 0
+"""
+
+
+def _today_bounds() -> tuple[int, int]:
     ts = int(time.time())
     today_start = ts - (ts % 86400) - 8 * 3600
-    today_end = today_start + 86400
-    with get_connection() as conn:
-        cur = conn.execute(
-            """SELECT 1 FROM hot_push_history
-               WHERE config_id = ? AND pushed_at >= ? AND pushed_at < ? AND status = 1
-               LIMIT 1""",
-            (config_id, today_start, today_end),
-        )
-        return cur.fetchone() is not None
+    return today_start, today_start + 86400
 
 
-def already_pushed_in_window(config_id: int, window_hours: int = 2) -> bool:
-    """检查该 config 在本 2 小时窗口内是否已推送（用于 8-20 每 2 小时推送）。"""
+def _window_bounds(window_hours: int) -> tuple[int, int]:
     now = time.localtime()
     y, m, d, hour = now.tm_year, now.tm_mon, now.tm_mday, now.tm_hour
     window_hour = (hour // window_hours) * window_hours
     window_start = int(time.mktime((y, m, d, window_hour, 0, 0, 0, 0, 0)))
-    window_end = window_start + window_hours * 3600
+    return window_start, window_start + window_hours * 3600
+
+
+def _pushed_config_ids(start: int, end: int) -> set[int]:
     with get_connection() as conn:
-        cur = conn.execute(
-            """SELECT 1 FROM hot_push_history
-               WHERE config_id = ? AND pushed_at >= ? AND pushed_at < ? AND status = 1
-               LIMIT 1""",
-            (config_id, window_start, window_end),
-        )
+        return {row[0] for row in conn.execute(_PUSHED_CONFIG_IDS_SQL, (start, end))}
+
+
+def already_pushed_today(config_id: int) -> bool:
+    """检查该 config 今日是否已推送。"""
+    with get_connection() as conn:
+        cur = conn.execute(_PUSHED_PROBE_SQL, (config_id, *_today_bounds()))
         return cur.fetchone() is not None
 
 
+def already_pushed_in_window(config_id: int, window_hours: int = 2) -> bool:
+    """检查该 config 在本 2 小时窗口内是否已推送（用于 8-20 每 2 小时推送）。"""
+    with get_connection() as conn:
+        cur = conn.execute(_PUSHED_PROBE_SQL, (config_id, *_window_bounds(window_hours)))
+        return cur.fetchone() is not None
+
+
+def pushed_config_ids_today() -> set[int]:
+    """今日已推送（成功或结果未知）的全部 config_id（一次查询，供批量判断）。"""
+    return _pushed_config_ids(*_today_bounds())
+
+
+def pushed_config_ids_in_window(window_hours: int = 2) -> set[int]:
+    """本窗口内已推送（成功或结果未知）的全部 config_id（一次查询，供批量判断）。"""
+    return _pushed_config_ids(*_window_bounds(window_hours))
+
+
+_INSERT_PUSH_HISTORY_SQL = """
+INSERT INTO hot_push_history
+(config_id, pushed_at, items_count, item_ids, status, error_msg, create_time)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def record_push_history(
     config_id: int,
     item_ids: list[int],
@@ -428,11 +725,23 @@ def record_push_history(
     error_msg: str | None = None,
 ) -> None:
     """记录推送历史。"""
+    record_push_history_many([(config_id, item_ids, status, error_msg)])
+
+
+def record_push_history_many(
+    records: list[tuple[int, list[int], int, str | None]],
+) -> None:
+    """批量记录推送历史（单事务 executemany）。
+
+    Args:
+        records: [(config_id, item_ids, status, error_msg), ...]
+    """
+    if not records:
+        return
     ts = int(time.time())
+    rows = [
+        (config_id, ts, len(item_ids), _json_dumps(item_ids), status, error_msg, ts)
+        for config_id, item_ids, status, error_msg in records
+    ]
     with get_connection() as conn:
-        conn.execute(
-            """INSERT INTO hot_push_history
-               (config_id, pushed_at, items_count, item_ids, status, error_msg, create_time)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            (config_id, ts, len(item_ids), json.dumps(item_ids), status, error_msg, ts),
-        )
+        conn.executemany(_INSERT_PUSH_HISTORY_SQL, rows)
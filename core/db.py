@@ -6,8 +6,11 @@ fastfish-lite 数据库初始化与连接管理。
 
 from __future__ import annotations
 
+import atexit
 import sqlite3
+import threading
 import time
+import weakref
 from contextlib import contextmanager
 from pathlib import Path
 from typing import Iterator
@@ -47,26 +50,30 @@ def init_database() -> None:
             with schema_path.open("r", encoding="utf-8") as f:
                 conn.executescript(f.read())
             conn.commit()
+        # 种子数据与全部迁移放在同一事务中，DDL 不再逐条自动提交
+        conn.execute("BEGIN")
+        rewritten_columns = _table_columns(conn, "hot_article_rewritten")
         _seed_if_empty(conn)
-        _migrate_rewritten_columns(conn)
-        _migrate_format_style_columns(conn)
+        _migrate_rewritten_columns(conn, rewritten_columns)
+        _migrate_format_style_columns(conn, rewritten_columns)
         _migrate_hot_push_tables(conn)
 
 
-def _migrate_rewritten_columns(conn: sqlite3.Connection) -> None:
+def _table_columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    """返回表的列名集合。"""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _migrate_rewritten_columns(conn: sqlite3.Connection, names: set[str]) -> None:
     """补充 author、digest 列。"""
-    info = conn.execute("PRAGMA table_info(hot_article_rewritten)").fetchall()
-    names = [row[1] for row in info]
     if "author" not in names:
         conn.execute("ALTER TABLE hot_article_rewritten ADD COLUMN author TEXT")
     if "digest" not in names:
         conn.execute("ALTER TABLE hot_article_rewritten ADD COLUMN digest TEXT")
 
 
-def _migrate_format_style_columns(conn: sqlite3.Connection) -> None:
+def _migrate_format_style_columns(conn: sqlite3.Connection, names: set[str]) -> None:
     """补充 format_style、content_format 列。"""
-    info = conn.execute("PRAGMA table_info(hot_article_rewritten)").fetchall()
-    names = [row[1] for row in info]
     if "format_style" not in names:
         conn.execute("ALTER TABLE hot_article_rewritten ADD COLUMN format_style TEXT DEFAULT 'minimal'")
     if "content_format" not in names:
@@ -74,28 +81,36 @@ def _migrate_format_style_columns(conn: sqlite3.Connection) -> None:
         conn.execute("UPDATE hot_article_rewritten SET content_format = 'html' WHERE content_format IS NULL")
 
 
+_HOT_ITEMS_RAW_DDL = """CREATE TABLE IF NOT EXISTS hot_items_raw (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    source          TEXT NOT NULL,
+    title           TEXT,
+    link            TEXT,
+    desc_text       TEXT,
+    hot             TEXT,
+    rank            INTEGER DEFAULT 0,
+    fetched_at      INTEGER NOT NULL,
+    create_time     INTEGER
+)"""
+
+_HOT_ITEMS_RAW_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_hot_items_raw_source_fetched ON hot_items_raw(source, fetched_at)",
+)
+
+
+def create_hot_items_raw_table(conn: sqlite3.Connection) -> None:
+    """创建 hot_items_raw 表及索引（已存在则跳过）；迁移与每次拉取前重建共用。"""
+    conn.execute(_HOT_ITEMS_RAW_DDL)
+    for ddl in _HOT_ITEMS_RAW_INDEXES:
+        try:
+            conn.execute(ddl)
+        except sqlite3.OperationalError:
+            pass
+
+
 def _migrate_hot_push_tables(conn: sqlite3.Connection) -> None:
     """补充每日热点推送相关表。"""
-    conn.execute(
-        """CREATE TABLE IF NOT EXISTS hot_items_raw (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            source          TEXT NOT NULL,
-            title           TEXT,
-            link            TEXT,
-            desc_text       TEXT,
-            hot             TEXT,
-            rank            INTEGER DEFAULT 0,
-            fetched_at      INTEGER NOT NULL,
-            create_time     INTEGER
-        )"""
-    )
-    try:
-        conn.execute(
-            "CREATE INDEX IF NOT EXISTS idx_hot_items_raw_source_fetched "
-            "ON hot_items_raw(source, fetched_at)"
-        )
-    except sqlite3.OperationalError:
-        pass
+    create_hot_items_raw_table(conn)
     conn.execute(
         """CREATE TABLE IF NOT EXISTS hot_push_config (
             id                  INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -133,6 +148,24 @@ def _migrate_hot_push_tables(conn: sqlite3.Connection) -> None:
         )
     except sqlite3.OperationalError:
         pass
+    # 仅含已推送（成功或结果未知）记录的部分索引，already_pushed_* 的探测查询无需回表检查 status；
+    # 旧版索引条件为 status = 1，无法用于 status != 0 的查询，先删除
+    try:
+        conn.execute("DROP INDEX IF EXISTS idx_hot_push_history_active")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_hot_push_history_sent "
+            "ON hot_push_history(config_id, pushed_at) WHERE status != 0"
+        )
+    except sqlite3.OperationalError:
+        pass
+    # get_hot_now 按 LOWER(category_code) 查找配置，表达式索引避免全表扫描
+    try:
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_hot_push_config_code_lower "
+            "ON hot_push_config(LOWER(category_code))"
+        )
+    except sqlite3.OperationalError:
+        pass
 
 
 def _seed_if_empty(conn: sqlite3.Connection) -> None:
@@ -154,19 +187,90 @@ def _seed_if_empty(conn: sqlite3.Connection) -> None:
         )
 
 
+# journal_mode=WAL 持久化在库文件中，每个库文件每进程设置一次即可；其余 PRAGMA 为连接级
+_wal_paths: set[Path] = set()
+# 每连接语句缓存容量（默认 100），SQL 以模块常量形式复用以命中缓存
+_CACHED_STATEMENTS = 256
+
+_CONNECTION_PRAGMAS = (
+    "PRAGMA foreign_keys = ON;",
+    "PRAGMA synchronous = NORMAL;",
+    "PRAGMA temp_store = MEMORY;",
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA cache_size = -20000;",
+    "PRAGMA busy_timeout = 5000;",
+)
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection 不支持弱引用，子类化后可放入 WeakSet。"""
+
+
+# 每线程缓存一个连接，仅由所属线程使用；线程结束后连接随线程局部存储释放并关闭。
+# 弱引用集合只用于进程退出时关闭仍存活的连接，为此以 check_same_thread=False 打开，允许主线程关闭
+_local = threading.local()
+_open_connections: weakref.WeakSet[_Connection] = weakref.WeakSet()
+_open_lock = threading.Lock()
+
+
+def _open_connection(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        db_path,
+        cached_statements=_CACHED_STATEMENTS,
+        check_same_thread=False,
+        factory=_Connection,
+    )
+    with _open_lock:
+        enable_wal = db_path not in _wal_paths
+        _wal_paths.add(db_path)
+        _open_connections.add(conn)
+    if enable_wal:
+        conn.execute("PRAGMA journal_mode = WAL;")
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@atexit.register
+def close_connections() -> None:
+    """关闭所有仍存活的线程缓存连接。"""
+    with _open_lock:
+        conns = list(_open_connections)
+        _open_connections.clear()
+    for conn in conns:
+        conn.close()
+
+
 @contextmanager
 def get_connection() -> Iterator[sqlite3.Connection]:
-    """获取 SQLite 连接的上下文管理器。"""
-    settings = get_settings()
-    db_path = settings.db_path
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
+    """获取当前线程复用的 SQLite 连接；最外层退出时提交，异常时回滚。
+
+    库路径变更时关闭旧连接并改用新库；嵌套在已开启的事务内时继续使用外层连接。
+    """
+    db_path = get_settings().db_path
+    conn = getattr(_local, "conn", None)
+    if conn is None or (_local.depth == 0 and _local.db_path != db_path):
+        if conn is not None:
+            with _open_lock:
+                _open_connections.discard(conn)
+            conn.close()
+        conn = _open_connection(db_path)
+        _local.conn = conn
+        _local.db_path = db_path
+        _local.depth = 0
+    _local.depth += 1
     try:
-        conn.execute("PRAGMA foreign_keys = ON;")
         yield conn
-        conn.commit()
+    except BaseException:
+        if _local.depth == 1:
+            conn.rollback()
+        raise
+    else:
+        if _local.depth == 1:
+            conn.commit()
     finally:
-        conn.close()
+        _local.depth -= 1
 
 
-__all__ = ["init_database", "get_connection"]
+__all__ = ["init_database", "get_connection", "close_connections", "create_hot_items_raw_table"]
@@ -11,8 +11,12 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -21,10 +25,18 @@ import markdown
 # 尝试导入 premailer，如果未安装则使用简化版
 try:
     from premailer import Premailer
+    from premailer.merge_style import csstext_to_pairs as _csstext_to_pairs
     PREMAILER_AVAILABLE = True
 except ImportError:
     PREMAILER_AVAILABLE = False
 
+# lxml 随 premailer 安装；仅含标签选择器的 CSS 用它一次遍历内联
+try:
+    from lxml import etree as _lxml_etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 # 预设样式名称
@@ -87,10 +99,12 @@ _STYLE_LABELS: dict[str, str] = {
 }
 
 
+@lru_cache(maxsize=1)
 def get_available_styles() -> list[dict[str, Any]]:
     """返回可用样式列表，供 IM 等前端展示选择。
 
     每项含 index（序号）、id、label，便于按序号展示和用户回复数字选择。
+    样式列表为静态数据，结果会被缓存，调用方不应修改返回值。
 
     Returns:
         [{"index": 1, "id": "minimal", "label": "极简"}, ...]
@@ -101,14 +115,56 @@ def get_available_styles() -> list[dict[str, Any]]:
     ]
 
 
+# CSS 解析
+_RE_ROOT = re.compile(r":root\s*\{([^}]+)\}", re.DOTALL)
+_RE_ROOT_STRIP = re.compile(r":root\s*\{[^}]*\}\s*")
+_RE_CSS_VAR = re.compile(r"var\(\s*(--[\w-]+)\s*\)")
+_RE_CSS_RULE = re.compile(r"([^{]+)\{([^}]+)\}")
+_RE_STYLE_ATTR = re.compile(r'style=["\']([^"\']*)["\']', re.IGNORECASE)
+
+_RE_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+# premailer 写 bgcolor 前将 #abc 补全为 #aabbcc
+_RE_SHORT_COLOR = re.compile(r"^#([0-9a-f])([0-9a-f])([0-9a-f])$", re.IGNORECASE)
+
+# 简化版 Inline 支持的标签选择器
+_SIMPLE_INLINE_TAGS = frozenset({"h1", "h2", "h3", "blockquote", "img", "p", "ul", "ol", "li"})
+_RE_SIMPLE_INLINE_TAG = re.compile(r"<(h1|h2|h3|blockquote|img|p|ul|ol|li)(\s[^>]*)?>", re.IGNORECASE)
+
+# Markdown 换行规范
+_RE_BLOCKQUOTE = re.compile(r"([。！？])\s*>")
+_RE_LIST = re.compile(r"([：:])\s*-\s*")
+_RE_HR = re.compile(r"([。！？\s])\s*---\s+")
+
+_MD_EXTENSIONS = ["extra", "codehilite", "tables"]
+
+# 渲染结果缓存：键为 (文本, 样式, 内联方式) 的摘要，只保存输出 HTML，按字符总量限额 LRU 淘汰
+_RENDER_CACHE_MAX_CHARS = 4 * 1024 * 1024
+_render_cache: OrderedDict[bytes, str] = OrderedDict()
+_render_cache_chars = 0
+_render_cache_lock = threading.Lock()
+
+# Markdown 实例构建开销大（加载扩展、编译正则）且非线程安全，每线程复用一个
+_md_local = threading.local()
+
+
+def _get_markdown() -> markdown.Markdown:
+    """返回当前线程复用的 Markdown 转换器（已 reset）。"""
+    md = getattr(_md_local, "md", None)
+    if md is None:
+        md = markdown.Markdown(extensions=_MD_EXTENSIONS)
+        _md_local.md = md
+    return md.reset()
+
+
 def _get_styles_dir() -> Path:
     """返回预设 CSS 文件所在目录。"""
     project_root = Path(__file__).resolve().parent.parent
     return project_root / "assets" / "styles"
 
 
+@lru_cache(maxsize=64)
 def _load_css(style_name: str) -> str:
-    """加载指定样式的 CSS 文件内容。
+    """加载指定样式的 CSS 文件内容（按样式名缓存，修改 CSS 文件后需重启生效）。
     
     支持两种路径：
     1. 基础样式：直接位于 styles_dir（如 business.css）
@@ -136,6 +192,7 @@ def _load_css(style_name: str) -> str:
         return ""
 
 
+@lru_cache(maxsize=64)
 def _resolve_css_variables(css: str) -> str:
     """解析 :root 中的 CSS 变量，将 var(--name) 替换为实际值。
 
@@ -144,7 +201,7 @@ def _resolve_css_variables(css: str) -> str:
     if not css or ":root" not in css:
         return css
     # 解析 :root { --var: value; ... }
-    root_match = re.search(r":root\s*\{([^}]+)\}", css, re.DOTALL)
+    root_match = _RE_ROOT.search(css)
     if not root_match:
         return css
     vars_map: dict[str, str] = {}
@@ -158,12 +215,10 @@ def _resolve_css_variables(css: str) -> str:
                 vars_map[key] = val
     if not vars_map:
         return css
-    # 替换 var(--name) 为实际值
-    result = css
-    for var_name, var_val in vars_map.items():
-        result = re.sub(rf"var\(\s*{re.escape(var_name)}\s*\)", var_val, result)
+    # 替换 var(--name) 为实际值（一次扫描，未定义的变量保持原样）
+    result = _RE_CSS_VAR.sub(lambda m: vars_map.get(m.group(1), m.group(0)), css)
     # 移除 :root 块（变量已解析，避免 premailer 处理异常）
-    result = re.sub(r":root\s*\{[^}]*\}\s*", "", result)
+    result = _RE_ROOT_STRIP.sub("", result)
     return result
 
 
@@ -218,38 +273,109 @@ def _inline_css_simple(html: str, css: str) -> str:
     if not css or not html:
         return html
 
-    css_rules: list[tuple[str, str]] = []
-    pattern = r"([^{]+)\{([^}]+)\}"
-    for match in re.finditer(pattern, css):
+    # 同一标签的多条规则按出现顺序合并，整份 HTML 只扫描一遍
+    merged: dict[str, list[str]] = {}
+    for match in _RE_CSS_RULE.finditer(css):
         selector = match.group(1).strip()
         declarations = match.group(2).strip()
-        if selector and declarations:
-            css_rules.append((selector, declarations))
-
-    result = html
-    for selector, declarations in css_rules:
-        selector_clean = selector.strip()
         # 支持常见的选择器：标签选择器
-        if selector_clean in ["h1", "h2", "h3", "blockquote", "img", "p", "ul", "ol", "li"]:
-            # 匹配标签，处理已有 style 属性的情况
-            tag_pattern = f"<{selector_clean}([^>]*?)>"
-            def replace_tag(m: re.Match) -> str:
-                attrs = m.group(1)
-                existing_style_match = re.search(r'style=["\']([^"\']*)["\']', attrs, re.IGNORECASE)
-                if existing_style_match:
-                    existing_style = existing_style_match.group(1)
-                    new_attrs = re.sub(
-                        r'style=["\'][^"\']*["\']',
-                        f'style="{existing_style}; {declarations}"',
-                        attrs,
-                        flags=re.IGNORECASE
-                    )
-                else:
-                    new_attrs = f'{attrs} style="{declarations}"'
-                return f"<{selector_clean}{new_attrs}>"
-            result = re.sub(tag_pattern, replace_tag, result, flags=re.IGNORECASE)
-
-    return result
+        if selector in _SIMPLE_INLINE_TAGS and declarations:
+            merged.setdefault(selector, []).append(declarations)
+    if not merged:
+        return html
+    tag_styles = {tag: "; ".join(decls) for tag, decls in merged.items()}
+
+    def replace_tag(m: re.Match) -> str:
+        tag = m.group(1).lower()
+        declarations = tag_styles.get(tag)
+        if declarations is None:
+            return m.group(0)
+        attrs = m.group(2) or ""
+        closing = ""
+        if attrs.endswith("/"):
+            attrs, closing = attrs[:-1].rstrip(), " /"
+        # 处理已有 style 属性的情况
+        existing = _RE_STYLE_ATTR.search(attrs)
+        if existing:
+            attrs = f'{attrs[:existing.start()]}style="{existing.group(1)}; {declarations}"{attrs[existing.end():]}'
+        else:
+            attrs = f'{attrs} style="{declarations}"'
+        return f"<{tag}{attrs}{closing}>"
+
+    return _RE_SIMPLE_INLINE_TAG.sub(replace_tag, html)
+
+
+@lru_cache(maxsize=64)
+def _parse_tag_only_css(css: str) -> dict[str, dict[str, str]] | None:
+    """CSS 仅由标签选择器（可逗号分组）组成时返回 {tag: {prop: value}}，否则返回 None。
+
+    含类/ID/后代/伪类/通配选择器、@ 规则、!important 或 unset 时返回 None，由 premailer 处理。
+    属性值经 premailer 同一解析函数规范化，结果被缓存，调用方不应修改。
+    """
+    css = _RE_CSS_COMMENT.sub("", css)
+    if "@" in css or "!" in css or "unset" in css.lower():
+        return None
+    tag_decls: dict[str, dict[str, str]] = {}
+    for match in _RE_CSS_RULE.finditer(css):
+        decls = dict(_csstext_to_pairs(match.group(2).strip(), validate=False))
+        for selector in match.group(1).split(","):
+            tag = selector.strip()
+            if not tag.isascii() or not tag.isalnum() or not tag.islower():
+                return None
+            tag_decls.setdefault(tag, {}).update(decls)
+    return tag_decls
+
+
+def _set_legacy_attributes(el: Any, style: str) -> None:
+    """同 premailer：由 text-align/vertical-align/background-color/width/height 写入旧式 HTML 属性。
+
+    供忽略 CSS 的邮件/IM 客户端使用，覆盖元素上已有的同名属性。
+    """
+    for decl in style.split(";"):
+        parts = decl.split(":")
+        if len(parts) != 2:
+            continue
+        key, value = parts[0].strip(), parts[1].strip()
+        if key == "text-align":
+            el.set("align", value)
+        elif key == "vertical-align":
+            el.set("valign", value)
+        elif key == "background-color" and "transparent" not in value.lower():
+            el.set("bgcolor", _RE_SHORT_COLOR.sub(r"#\1\1\2\2\3\3", value))
+        elif key in ("width", "height"):
+            el.set(key, value[:-2] if value.endswith("px") else value)
+
+
+def _inline_css_lxml(html: str, tag_decls: dict[str, dict[str, str]]) -> str:
+    """按 {tag: {prop: value}} 一次遍历 lxml 树内联样式，输出与 premailer 一致。
+
+    与 premailer 相同：整页 html/head/body 包装，元素已有的 style 优先，
+    补写 align/bgcolor 等旧式属性，带 float 的图片补 align。
+    """
+    # 与 premailer 相同的解析方式：<style> 前缀使 head 存在，解析后移除
+    source = f"<style></style>{html}".strip()
+    tree = _lxml_etree.fromstring(source, _lxml_etree.HTMLParser()).getroottree()
+    page = tree.getroot()
+    for style_el in page.iter("style"):
+        style_el.getparent().remove(style_el)
+        break
+    for el in page.iter():
+        if not isinstance(el.tag, str):
+            continue
+        decls = tag_decls.get(el.tag)
+        if decls:
+            existing = el.get("style")
+            if existing:
+                decls = {**decls, **dict(_csstext_to_pairs(existing))}
+            style = "; ".join(f"{prop}:{val}" for prop, val in decls.items())
+            el.set("style", style)
+            _set_legacy_attributes(el, style)
+        if el.tag == "img" and el.get("style") is not None:
+            img_float = dict(_csstext_to_pairs(el.get("style"))).get("float")
+            if img_float in ("left", "right"):
+                el.set("align", img_float)
+    root = tree if source.startswith(tree.docinfo.doctype) else page
+    return _lxml_etree.tostring(root, method="html", pretty_print=True, encoding="utf-8").decode("utf-8")
 
 
 def _inline_css(html: str, css: str, use_premailer: bool = True) -> str:
@@ -264,6 +390,15 @@ def _inline_css(html: str, css: str, use_premailer: bool = True) -> str:
         内联 CSS 后的 HTML
     """
     if use_premailer and PREMAILER_AVAILABLE:
+        # 正文自带 <style>/<link> 时 premailer 会一并解析应用，交由 premailer 处理
+        lowered = html.lower()
+        if LXML_AVAILABLE and css and html and "<style" not in lowered and "<link" not in lowered:
+            tag_decls = _parse_tag_only_css(css)
+            if tag_decls is not None:
+                try:
+                    return _inline_css_lxml(html, tag_decls)
+                except Exception as e:
+                    logger.debug(f"lxml 内联失败，改用 premailer: {e}")
         return _inline_css_premailer(html, css)
     else:
         return _inline_css_simple(html, css)
@@ -275,11 +410,11 @@ def _normalize_markdown_newlines(text: str) -> str:
         return text
     t = text
     # 句末紧跟 > 时补换行，使 blockquote 生效
-    t = re.sub(r"([。！？])\s*>", r"\1\n\n>", t)
+    t = _RE_BLOCKQUOTE.sub(r"\1\n\n>", t)
     # "xxx: - 项目" 或 "xxx: -项目" 补换行，使列表生效
-    t = re.sub(r"([：:])\s*-\s*", r"\1\n\n- ", t)
+    t = _RE_LIST.sub(r"\1\n\n- ", t)
     # "xxx。---  yyy" 补换行，使 --- 渲染为分隔线而非字面量
-    t = re.sub(r"([。！？\s])\s*---\s+", r"\1\n\n---\n\n", t)
+    t = _RE_HR.sub(r"\1\n\n---\n\n", t)
     return t
 
 
@@ -301,14 +436,53 @@ def render_markdown_to_html(
     if not markdown_text or not str(markdown_text).strip():
         return ""
 
-    markdown_text = _normalize_markdown_newlines(markdown_text)
-
     if format_style not in _SUPPORTED_STYLES:
         logger.warning(f"不支持的样式 '{format_style}'，使用默认样式 '{_DEFAULT_STYLE}'")
         format_style = _DEFAULT_STYLE
 
-    md = markdown.Markdown(extensions=["extra", "codehilite", "tables"])
-    html = md.convert(markdown_text)
+    markdown_text = str(markdown_text)
+    key = hashlib.blake2b(
+        f"{format_style}\0{bool(use_premailer)}\0{markdown_text}".encode("utf-8", "surrogatepass"),
+        digest_size=16,
+    ).digest()
+    with _render_cache_lock:
+        html = _render_cache.get(key)
+        if html is not None:
+            _render_cache.move_to_end(key)
+            return html
+    html = _render(markdown_text, format_style, bool(use_premailer))
+    _render_cache_put(key, html)
+    return html
+
+
+def _render_cache_put(key: bytes, html: str) -> None:
+    """写入渲染缓存，超出字符总量时淘汰最久未用的条目；单条超过总量的不缓存。"""
+    global _render_cache_chars
+    if len(html) > _RENDER_CACHE_MAX_CHARS:
+        return
+    with _render_cache_lock:
+        old = _render_cache.pop(key, None)
+        if old is not None:
+            _render_cache_chars -= len(old)
+        _render_cache[key] = html
+        _render_cache_chars += len(html)
+        while _render_cache_chars > _RENDER_CACHE_MAX_CHARS:
+            _, evicted = _render_cache.popitem(last=False)
+            _render_cache_chars -= len(evicted)
+
+
+def _render_cache_clear() -> None:
+    global _render_cache_chars
+    with _render_cache_lock:
+        _render_cache.clear()
+        _render_cache_chars = 0
+
+
+def _render(markdown_text: str, format_style: str, use_premailer: bool) -> str:
+    """Markdown 转 HTML 并内联所选样式（不经缓存）。"""
+    markdown_text = _normalize_markdown_newlines(markdown_text)
+
+    html = _get_markdown().convert(markdown_text)
 
     css = _load_css(format_style)
     if css:
@@ -320,6 +494,9 @@ def render_markdown_to_html(
     return html
 
 
+render_markdown_to_html.cache_clear = _render_cache_clear  # type: ignore[attr-defined]
+
+
 def render_markdown_to_html_simple(
     markdown_text: str,
     format_style: str = _DEFAULT_STYLE,
@@ -327,8 +504,7 @@ def render_markdown_to_html_simple(
     """简化版：仅 Markdown 转 HTML，不注入 CSS（用于测试或外部 CSS）。"""
     if not markdown_text or not str(markdown_text).strip():
         return ""
-    md = markdown.Markdown(extensions=["extra", "codehilite", "tables"])
-    return md.convert(markdown_text)
+    return _get_markdown().convert(markdown_text)
 
 
 __all__ = [
@@ -6,11 +6,44 @@ fastfish-lite 敏感词检测模块。
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import mmap
 import os
 import re
+import sys
+import threading
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
+
+from config import get_settings
+
+# orjson 可选（C 实现，更快）；不可用时回退标准库 json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+# pyahocorasick 可选（C 实现的 Aho-Corasick）；不可用时回退纯 Python DFAMatcher
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# lxml 随 premailer 安装；不可用时 _strip_html 回退到正则
+try:
+    from lxml.html import fromstring as _lxml_fromstring
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -29,68 +62,207 @@ CATEGORY_NAMES: dict[str, str] = {
 }
 
 
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_WS = re.compile(r"\s+")
+
+
 def _strip_html(html: str) -> str:
     if not html or not str(html).strip():
         return ""
-    text = re.sub(r"<[^>]+>", "", str(html))
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    html = str(html)
+    # 纯文本（无标签、无实体）无需解析，直接折叠空白
+    if "<" not in html and "&" not in html:
+        return " ".join(html.split())
+    if LXML_AVAILABLE:
+        try:
+            return " ".join(_lxml_fromstring(html).text_content().split())
+        except Exception:
+            pass
+    return _RE_WS.sub(" ", _RE_TAG.sub("", html)).strip()
+
+
+class Match(NamedTuple):
+    """单条敏感词命中。内部以紧凑元组保存，仅在对外返回时转为 dict。"""
+
+    category: str
+    category_name: str
+    word: str
+    in_: str
+
+    def to_dict(self) -> dict[str, str]:
+        return {"category": self.category, "category_name": self.category_name, "word": self.word, "in": self.in_}
+
+
+# 状态号左移后与字符码位拼成转移表键（Unicode 码位 < 2**21）
+_CHAR_BITS = 21
 
 
 class DFAMatcher:
-    """DFA 敏感词匹配器。"""
+    """DFA 敏感词匹配器（纯 Python 回退实现）。
+
+    trie 压平为单个转移表 {(state << 21) | ord(ch): next_state} 加终止标记 bytearray，
+    每个字符只做一次 dict 查找，不再为每个节点分配一个 dict。
+    """
 
     def __init__(self, words: list[str]) -> None:
-        self._root: dict[str, Any] = {}
+        goto: dict[int, int] = {}
+        terminal = bytearray(1)
+        first_chars: set[int] = set()
         for w in words:
             w = (w or "").strip()
             if not w:
                 continue
-            node = self._root
+            first_chars.add(ord(w[0]))
+            state = 0
             for c in w:
-                if c not in node:
-                    node[c] = {}
-                node = node[c]
-            node["__end__"] = True
+                key = (state << _CHAR_BITS) | ord(c)
+                nxt = goto.get(key)
+                if nxt is None:
+                    nxt = len(terminal)
+                    goto[key] = nxt
+                    terminal.append(0)
+                state = nxt
+            terminal[state] = 1
+        self._goto = goto
+        self._terminal = terminal
+        # 词首字符集合编译为字符类，由 C 实现的 re 跳到下一个候选起点，只在候选处走转移表
+        self._first_char_re: re.Pattern[str] | None = (
+            re.compile("[" + "".join(re.escape(chr(c)) for c in sorted(first_chars)) + "]")
+            if first_chars
+            else None
+        )
 
     def search(self, text: str) -> list[tuple[int, int, str]]:
-        if not text:
+        if not text or self._first_char_re is None:
             return []
+        anchor_search = self._first_char_re.search
+        goto_get = self._goto.get
+        terminal = self._terminal
         result: list[tuple[int, int, str]] = []
         n = len(text)
-        i = 0
-        while i < n:
-            node = self._root
+        m = anchor_search(text)
+        while m is not None:
+            i = m.start()
+            state = 0
             j = i
-            matched_word: list[str] = []
             last_end = -1
-            while j < n and text[j] in node:
-                matched_word.append(text[j])
-                node = node[text[j]]
+            while j < n:
+                state = goto_get((state << _CHAR_BITS) | ord(text[j]))
+                if state is None:
+                    break
                 j += 1
-                if node.get("__end__"):
+                if terminal[state]:
                     last_end = j
             if last_end > 0:
-                word = "".join(matched_word[: last_end - i])
-                result.append((i, last_end, word))
+                result.append((i, last_end, text[i:last_end]))
                 i = last_end
             else:
                 i += 1
+            m = anchor_search(text, i)
+        return result
+
+
+class AhoCorasickMatcher:
+    """基于 pyahocorasick 的敏感词匹配器，search 结果与 DFAMatcher 一致（最左最长、不重叠）。"""
+
+    def __init__(self, words: list[str]) -> None:
+        self._automaton = ahocorasick.Automaton()
+        for w in words:
+            w = (w or "").strip()
+            if w:
+                self._automaton.add_word(w, w)
+        self._automaton.make_automaton()
+
+    def search(self, text: str) -> list[tuple[int, int, str]]:
+        if not text or self._automaton.kind != ahocorasick.AHOCORASICK:
+            return []
+        # 单次 C 扫描得到全部（可重叠）命中，再按起点取最长、跳过重叠
+        longest: dict[int, str] = {}
+        for end, word in self._automaton.iter(text):
+            start = end - len(word) + 1
+            if len(word) > len(longest.get(start, "")):
+                longest[start] = word
+        result: list[tuple[int, int, str]] = []
+        pos = 0
+        for start in sorted(longest):
+            if start >= pos:
+                word = longest[start]
+                pos = start + len(word)
+                result.append((start, pos, word))
         return result
 
 
-def _load_words_from_file(path: Path) -> list[str]:
+def _build_matcher(words: list[str]) -> AhoCorasickMatcher | DFAMatcher:
+    return AhoCorasickMatcher(words) if AHOCORASICK_AVAILABLE else DFAMatcher(words)
+
+
+# 命中词预览条数
+_PREVIEW_WORDS = 5
+
+# 词库缓存写在应用数据目录（库文件同级的 cache/），不写入用户管理的词库目录
+_CACHE_SUBDIR = Path("cache") / "sensitive"
+_CACHE_PREFIX = "lexicon."
+# 缓存格式版本：缓存内容结构或词条清洗规则（_load_words_from_file）变化时加一，使旧缓存失效
+_CACHE_VERSION = 1
+# check() 拼接标题与正文的分隔符，含该字符的词条会被忽略
+_FIELD_SEP = "\x00"
+
+
+def _load_word_category_cache(path: Path) -> dict[str, str] | None:
+    """读取 词 -> 分类 缓存（纯 JSON 数据，不反序列化对象）；不存在、损坏或内容不符时返回 None。"""
+    try:
+        data = _json_loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"读取敏感词缓存失败，将重新构建: {path}, {e}")
+        return None
+    if not isinstance(data, dict):
+        logger.warning(f"敏感词缓存格式不符，将重新构建: {path}")
+        return None
+    categories = {cat: sys.intern(cat) for cat in CATEGORY_FILES}
+    word_category: dict[str, str] = {}
+    for w, cat in data.items():
+        cat = categories.get(cat) if isinstance(cat, str) else None
+        if cat is None or not w or _FIELD_SEP in w:
+            logger.warning(f"敏感词缓存内容不符，将重新构建: {path}")
+            return None
+        word_category[w] = cat
+    return word_category
+
+
+def _save_word_category_cache(path: Path, word_category: dict[str, str]) -> None:
+    """写入 词 -> 分类 缓存并清理旧缓存。先写临时文件再原子替换，多进程同时重建也不会读到半截文件。"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(_json_dumps_bytes(word_category))
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"写入敏感词缓存失败: {path}, {e}")
+        tmp.unlink(missing_ok=True)
+        return
+    for old in path.parent.glob(f"{_CACHE_PREFIX}*.json"):
+        if old != path:
+            old.unlink(missing_ok=True)
+
+
+def _load_words_from_file(entry: os.DirEntry) -> list[str]:
+    """读取 os.scandir 得到的词库文件条目（调用方已确认是文件）。
+
+    通过 mmap 逐行读取，不整体解码整个文件，大词库加载时峰值内存更低。
+    """
     words: list[str] = []
-    if not path.exists() or not path.is_file():
-        return words
     try:
-        content = path.read_text(encoding="utf-8", errors="ignore")
-        for line in content.splitlines():
-            w = line.strip()
-            if w and not w.startswith("#"):
-                words.append(w)
+        if entry.stat().st_size == 0:  # 空文件无法 mmap
+            return words
+        with open(entry.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b""):
+                w = raw.decode("utf-8", "ignore").strip()
+                if w and not w.startswith("#") and _FIELD_SEP not in w:
+                    words.append(w)
     except Exception as e:
-        logger.warning(f"读取敏感词文件失败: {path}, {e}")
+        logger.warning(f"读取敏感词文件失败: {entry.path}, {e}")
     return words
 
 
@@ -106,12 +278,22 @@ class SensitiveChecker:
                 project_root = Path(__file__).resolve().parent.parent
                 vocabulary_dir = project_root / "data" / "sensitive_lexicon" / "Vocabulary"
         self.vocabulary_dir = Path(vocabulary_dir).resolve()
-        self._matchers: dict[str, DFAMatcher] = {}
+        # 全部分类合并为一个匹配器，每段文本只扫描一遍；词 -> 分类（同词取首个分类）
+        self._matcher: AhoCorasickMatcher | DFAMatcher | None = None
+        self._word_category: dict[str, str] = {}
         self._loaded = False
+        self._load_lock = threading.Lock()
 
     def _ensure_loaded(self) -> bool:
         if self._loaded:
-            return len(self._matchers) > 0
+            return self._matcher is not None
+        # 双重检查：并发的首次调用只构建一次
+        with self._load_lock:
+            if self._loaded:
+                return self._matcher is not None
+            return self._load()
+
+    def _load(self) -> bool:
         if not self.vocabulary_dir.exists() or not self.vocabulary_dir.is_dir():
             logger.warning(
                 f"敏感词库目录不存在: {self.vocabulary_dir}，跳过敏感词检测。"
@@ -119,37 +301,69 @@ class SensitiveChecker:
             )
             self._loaded = True
             return False
-        for cat, files in CATEGORY_FILES.items():
-            all_words: list[str] = []
-            for fname in files:
-                fpath = self.vocabulary_dir / fname
-                words = _load_words_from_file(fpath)
-                all_words.extend(words)
-            if all_words:
-                self._matchers[cat] = DFAMatcher(all_words)
+        # 一次 scandir 取得全部词库文件条目，缓存键与读文件都复用，避免逐个 exists/stat
+        try:
+            with os.scandir(self.vocabulary_dir) as it:
+                entries = {e.name: e for e in it if e.is_file()}
+        except OSError as e:
+            logger.warning(f"读取敏感词库目录失败: {self.vocabulary_dir}, {e}")
+            entries = {}
+        # 缓存只存去重后的 词 -> 分类，匹配器每次由其重建，省去读取与解析词库文件
+        cache_path = self._cache_path(entries)
+        word_category = _load_word_category_cache(cache_path)
+        if word_category is None:
+            word_category = {}
+            for cat, files in CATEGORY_FILES.items():
+                cat = sys.intern(cat)
+                for fname in files:
+                    entry = entries.get(fname)
+                    if entry is None:
+                        continue
+                    for w in _load_words_from_file(entry):
+                        word_category.setdefault(w, cat)
+            if word_category:
+                _save_word_category_cache(cache_path, word_category)
+        if word_category:
+            self._matcher = _build_matcher(list(word_category))
+            self._word_category = word_category
         self._loaded = True
-        return len(self._matchers) > 0
+        return self._matcher is not None
+
+    def _cache_path(self, entries: dict[str, os.DirEntry]) -> Path:
+        """按词库目录与各词库文件 (名称, mtime, 大小) 计算缓存文件路径，词库变更即失效。"""
+        h = hashlib.sha1(f"{_CACHE_VERSION}:{self.vocabulary_dir};".encode())
+        for files in CATEGORY_FILES.values():
+            for fname in files:
+                entry = entries.get(fname)
+                try:
+                    st = entry.stat() if entry is not None else None
+                except OSError:
+                    st = None
+                if st is None:
+                    h.update(f"{fname}:-;".encode())
+                else:
+                    h.update(f"{fname}:{st.st_mtime_ns}:{st.st_size};".encode())
+        cache_dir = get_settings().db_path.parent / _CACHE_SUBDIR
+        return cache_dir / f"{_CACHE_PREFIX}{h.hexdigest()}.json"
 
     def check(self, title: str, content_html: str) -> dict[str, Any]:
+        """检测标题与正文。matched 为 Match 列表，需要 JSON 时调用 Match.to_dict()。"""
         content_text = _strip_html(content_html or "")
         title = (title or "").strip()
         local_loaded = self._ensure_loaded()
         if local_loaded:
-            matched: list[dict[str, str]] = []
-            failed_categories: list[str] = []
-            for cat, matcher in self._matchers.items():
-                cat_name = CATEGORY_NAMES.get(cat, cat)
-                for start, end, word in matcher.search(title):
-                    matched.append({"category": cat, "category_name": cat_name, "word": word, "in": "title"})
-                    if cat not in failed_categories:
-                        failed_categories.append(cat)
-                for start, end, word in matcher.search(content_text):
-                    matched.append({"category": cat, "category_name": cat_name, "word": word, "in": "content"})
-                    if cat not in failed_categories:
-                        failed_categories.append(cat)
+            matched: list[Match] = []
+            failed_cats: dict[str, None] = {}  # 有序去重
+            # 标题与正文以分隔符拼接后只扫描一次；词中不含分隔符，命中不会跨越两段
+            title_len = len(title)
+            for start, end, word in self._matcher.search(f"{title}{_FIELD_SEP}{content_text}"):
+                cat = self._word_category[word]
+                matched.append(Match(cat, CATEGORY_NAMES.get(cat, cat), word, "title" if end <= title_len else "content"))
+                failed_cats[cat] = None
             if matched:
-                words_preview = [m["word"] for m in matched[:5]]
-                if len(matched) > 5:
+                failed_categories = list(failed_cats)
+                words_preview = [m.word for m in matched[:_PREVIEW_WORDS]]
+                if len(matched) > _PREVIEW_WORDS:
                     words_preview.append("...")
                 msg = f"内容含敏感词，涉及：{', '.join(CATEGORY_NAMES.get(c, c) for c in failed_categories)}，示例：{', '.join(words_preview)}"
                 return {
@@ -169,13 +383,18 @@ class SensitiveChecker:
 
 
 _checker: SensitiveChecker | None = None
+_checker_lock = threading.Lock()
 
 
 def get_checker(vocabulary_dir: Path | None = None) -> SensitiveChecker:
     global _checker
-    if _checker is None:
-        _checker = SensitiveChecker(vocabulary_dir)
-    return _checker
+    checker = _checker
+    if checker is None:
+        with _checker_lock:
+            checker = _checker
+            if checker is None:
+                checker = _checker = SensitiveChecker(vocabulary_dir)
+    return checker
 
 
 def check_content_compliance_with_status(row: dict[str, Any]) -> tuple[bool, str, dict[str, Any]]:
@@ -190,6 +409,6 @@ def check_content_compliance_with_status(row: dict[str, Any]) -> tuple[bool, str
     }
     if result["passed"]:
         return True, "", status
-    status["matched"] = result.get("matched", [])
+    status["matched"] = [m.to_dict() for m in result.get("matched", [])]
     status["failed_categories"] = result.get("failed_categories", [])
     return False, result["message"], status
@@ -9,6 +9,25 @@ from __future__ import annotations
 import re
 from core.render import _normalize_markdown_newlines
 
+_TEMPLATE_TAGS = r"主标题|副标题|作者|摘要|导语|段落标题|段落|引用|列表|分隔线|图片|结语|署名"
+_LIST_PREFIX = r"(?:要点|原因|方案|建议|步骤|总结)[：:]"
+
+_P_TAG_HEAD = re.compile(r"^\[(主标题|作者|摘要|导语|段落标题|段落|引用|列表|分隔线|图片|结语|署名)\]", re.M)
+_P_HAS_SENTENCE_BREAK = re.compile(r"[。！？]\s*[^\s。！？]")
+_P_SENTENCE_SPLIT = re.compile(r"([。！？])\s*")
+_P_MULTI_BLANK = re.compile(r"\n\n+")
+_P_DEMO_ENV = re.compile(r"([。！？\s]*)(演示环境[：:][^\n]+?)(?=[。！？\n]|$)")
+_P_INTRO = re.compile(r"(?m)^((?:导语|导语简介|摘要|前言)[：:][^\n]+)")
+_P_SECTION_HEAD = re.compile(r"(?m)^([一二三四五六七八九十]+、[^\n]*)")
+_P_HEADINGS = re.compile(r"(?m)^(?:([一二三四五六七八九十]+、[^\n]*)|(\d+[\.．]\s*[^\n]+[：:])\s*)")
+_P_LIST_INLINE = re.compile(rf"({_LIST_PREFIX})\s*([^\n]+)")
+_P_LIST_MULTILINE = re.compile(rf"({_LIST_PREFIX})\s*\n((?:(?:\d+[\.．]|[-*])\s*.+\n?)+)")
+_P_NUM_ITEM = re.compile(r"\d+[\.．]\s*")
+_P_NUM_LINE_HEAD = re.compile(r"^(\d+)[\.．]\s*", re.M)
+_P_SUBHEADING = re.compile(r"^[一二三四五六七八九十]+、")
+# 使用 [^\[]* 而非 .*? 避免误匹配：内容截断到下一个 [ 之前
+_P_TEMPLATE_BLOCK = re.compile(rf"\[({_TEMPLATE_TAGS})\]\s*\n?([^\[]*)", re.DOTALL)
+
 
 def normalize_to_wechat_format(text: str) -> tuple[str, str | None]:
     """将自由文本整理为公众号规范 Markdown。
@@ -30,7 +49,7 @@ def normalize_to_wechat_format(text: str) -> tuple[str, str | None]:
     t = text.strip()
 
     # 1. 若已是 [标签] 格式，解析为 Markdown（主标题不输出到 content）
-    if re.search(r"^\[(主标题|作者|摘要|导语|段落标题|段落|引用|列表|分隔线|图片|结语|署名)\]", t, re.M):
+    if _P_TAG_HEAD.search(t):
         content, title = _parse_template_to_markdown(t)
         return content, title
 
@@ -38,41 +57,24 @@ def normalize_to_wechat_format(text: str) -> tuple[str, str | None]:
     t = _normalize_markdown_newlines(t)
 
     # 3. 无段落分隔时按句号分段
-    if "\n\n" not in t and re.search(r"[。！？]\s*[^\s。！？]", t):
-        t = re.sub(r"([。！？])\s*", r"\1\n\n", t)
-        t = re.sub(r"\n\n+", "\n\n", t).strip()
+    # 切分只在标点后插入单个空行，无需单独收拢空行，由第 4 步统一处理
+    if "\n\n" not in t and _P_HAS_SENTENCE_BREAK.search(t):
+        t = _P_SENTENCE_SPLIT.sub(r"\1\n\n", t)
 
     # 4. 段落中「演示环境:xxx」转为引用块
-    t = re.sub(
-        r"([。！？\s]*)(演示环境[：:][^\n]+?)(?=[。！？\n]|$)",
-        r"\1\n\n> \2\n\n",
-        t,
-    )
-    t = re.sub(r"\n\n+", "\n\n", t).strip()
+    t = _P_DEMO_ENV.sub(r"\1\n\n> \2\n\n", t)
+    t = _P_MULTI_BLANK.sub("\n\n", t).strip()
 
     # 5. 「导语」「导语简介」「摘要」「前言」开头的段落转引用块（增强样式效果）
-    t = re.sub(
-        r"(?m)^((?:导语|导语简介|摘要|前言)[：:][^\n]+)",
-        r"> \1",
-        t,
-    )
+    t = _P_INTRO.sub(r"> \1", t)
 
     # 6. 「要点」「原因」「方案」等 + 1.2.3. 或 - 转为列表
     t = _convert_list_patterns(t)
 
     # 7. 「一、」「二、」等章节标题加 ###（行首出现时）
-    t = re.sub(
-        r"(?m)^([一二三四五六七八九十]+、[^\n]*)",
-        r"### \1",
-        t,
-    )
-
     # 8. 「1. xxx：」「2. xxx：」等编号小节转 ###（增强结构，便于样式生效）
-    t = re.sub(
-        r"(?m)^(\d+[\.．]\s*[^\n]+[：:])\s*",
-        r"### \1\n\n",
-        t,
-    )
+    # 两类行首前缀互斥，合并为一次扫描
+    t = _P_HEADINGS.sub(_heading_repl, t)
 
     # 9. 首段若较短且无 ##，可视为二级标题
     lines = t.split("\n")
@@ -85,24 +87,29 @@ def normalize_to_wechat_format(text: str) -> tuple[str, str | None]:
     return t.strip(), None
 
 
+def _heading_repl(m: re.Match) -> str:
+    section, numbered = m.group(1), m.group(2)
+    if section is not None:
+        return f"### {section}"
+    # 编号后的 \s* 可能跨行吞入下一行，其中的章节标题同样要加 ###
+    if "\n" in numbered:
+        numbered = _P_SECTION_HEAD.sub(r"### \1", numbered)
+    return f"### {numbered}\n\n"
+
+
 def _convert_list_patterns(text: str) -> str:
     """将「要点：1. 2. 3.」「原因：- xxx」等转为 Markdown 列表。"""
     # 匹配「要点：」「原因：」「方案：」等 + 同一行或后续行的 1.2.3. 或 - 列表
-    prefix = r"(?:要点|原因|方案|建议|步骤|总结)[：:]"
     # 行内：要点：1.xxx 2.xxx 3.xxx —— 将数字编号替换为 -
-    text = re.sub(
-        rf"({prefix})\s*([^\n]+)",
-        lambda m: m.group(1) + "\n\n" + re.sub(r"\d+[\.．]\s*", "- ", m.group(2))
-        if re.search(r"\d+[\.．]\s*", m.group(2))
+    text = _P_LIST_INLINE.sub(
+        lambda m: m.group(1) + "\n\n" + _P_NUM_ITEM.sub("- ", m.group(2))
+        if _P_NUM_ITEM.search(m.group(2))
         else m.group(0),
         text,
     )
     # 多行：要点：\n1. xxx\n2. xxx —— 行首数字编号转 -
-    text = re.sub(
-        rf"({prefix})\s*\n((?:(?:\d+[\.．]|[-*])\s*.+\n?)+)",
-        lambda m: m.group(1) + "\n\n" + re.sub(
-            r"^(\d+)[\.．]\s*", r"- ", m.group(2), flags=re.M
-        ),
+    text = _P_LIST_MULTILINE.sub(
+        lambda m: m.group(1) + "\n\n" + _P_NUM_LINE_HEAD.sub(r"- ", m.group(2)),
         text,
     )
     return text
@@ -119,7 +126,7 @@ def _paragraph_with_subheadings(content: str) -> str:
         if not stripped:
             result.append("")
             continue
-        if re.match(r"^[一二三四五六七八九十]+、", stripped):
+        if _P_SUBHEADING.match(stripped):
             result.append(f"### {stripped}")
         else:
             result.append(stripped)
@@ -136,10 +143,7 @@ def _parse_template_to_markdown(text: str) -> tuple[str, str | None]:
         return text, None
 
     blocks: list[tuple[str, str]] = []
-    tag_pattern = r"主标题|副标题|作者|摘要|导语|段落标题|段落|引用|列表|分隔线|图片|结语|署名"
-    # 使用 [^\[]* 而非 .*? 避免误匹配：内容截断到下一个 [ 之前
-    pattern = rf"\[({tag_pattern})\]\s*\n?([^\[]*)"
-    for m in re.finditer(pattern, text, re.DOTALL):
+    for m in _P_TEMPLATE_BLOCK.finditer(text):
         tag, content = m.group(1), m.group(2).strip()
         if not content and tag != "分隔线":
             continue
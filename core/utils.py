@@ -7,8 +7,12 @@ fastfish-lite 工具函数。
 from __future__ import annotations
 
 import os
+import stat
 from pathlib import Path
 
+# 封面图大小上限
+_MAX_COVER_SIZE = 10 * 1024 * 1024
+
 
 def validate_cover_image_path(pic: str, images_base_path: Path) -> tuple[bool, str | None]:
     """验证封面图路径是否有效。
@@ -31,20 +35,25 @@ def validate_cover_image_path(pic: str, images_base_path: Path) -> tuple[bool, s
     if not path.is_absolute():
         path = images_base_path / raw
 
-    if not path.exists():
+    # 一次 stat 取得类型与大小，避免 exists/is_file/stat 重复系统调用
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
         return False, f"文件不存在: {path}"
-    if not path.is_file():
+    except PermissionError:
+        return False, f"文件无访问权限: {path}"
+    except OSError as e:
+        return False, f"文件无法访问（{e.strerror or e}）: {path}"
+    except ValueError as e:
+        return False, f"文件路径无效（{e}）: {path}"
+    if not stat.S_ISREG(st.st_mode):
         return False, f"不是文件（可能是目录）: {path}"
     try:
         if not os.access(path, os.R_OK):
             return False, f"文件无读取权限: {path}"
     except Exception as e:
         return False, f"权限检查失败: {str(e)}"
-    try:
-        file_size = path.stat().st_size
-        max_size = 10 * 1024 * 1024
-        if file_size > max_size:
-            return False, f"文件过大（{file_size / 1024 / 1024:.2f}MB），最大支持 10MB: {path}"
-    except Exception as e:
-        return False, f"获取文件大小失败: {str(e)}"
+    file_size = st.st_size
+    if file_size > _MAX_COVER_SIZE:
+        return False, f"文件过大（{file_size / 1024 / 1024:.2f}MB），最大支持 10MB: {path}"
     return True, None
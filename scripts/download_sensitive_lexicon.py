@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import quote
 
@@ -22,24 +24,38 @@ FILES = [
     "补充词库.txt",
     "其他词库.txt",
 ]
+# 流式写盘的分块大小
+_CHUNK_SIZE = 64 * 1024
+
+
+def _download(session: requests.Session, fname: str, vocab_dir: Path) -> bool:
+    """流式下载单个词库文件；先写临时文件再替换，失败不会留下半截词库。"""
+    url = f"{BASE_URL}/{quote(fname)}"
+    out_path = vocab_dir / fname
+    tmp_path = out_path.with_name(f"{fname}.tmp")
+    try:
+        with session.get(url, timeout=30, stream=True) as r:
+            r.raise_for_status()
+            with tmp_path.open("wb") as f:
+                for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(tmp_path, out_path)
+        print(f"已下载: {fname}")
+        return True
+    except Exception as e:
+        tmp_path.unlink(missing_ok=True)
+        print(f"下载失败 {fname}: {e}")
+        return False
 
 
 def main() -> int:
     project_root = Path(__file__).resolve().parent.parent
     vocab_dir = project_root / "data" / "sensitive_lexicon" / "Vocabulary"
     vocab_dir.mkdir(parents=True, exist_ok=True)
-    ok = 0
-    for fname in FILES:
-        url = f"{BASE_URL}/{quote(fname)}"
-        out_path = vocab_dir / fname
-        try:
-            r = requests.get(url, timeout=30)
-            r.raise_for_status()
-            out_path.write_text(r.text, encoding="utf-8")
-            print(f"已下载: {fname}")
-            ok += 1
-        except Exception as e:
-            print(f"下载失败 {fname}: {e}")
+    # 共用一个 Session 复用连接，各文件并发下载
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=len(FILES)) as pool:
+        results = list(pool.map(lambda fname: _download(session, fname, vocab_dir), FILES))
+    ok = sum(results)
     print(f"完成: {ok}/{len(FILES)} 个文件")
     return 0 if ok == len(FILES) else 1
 
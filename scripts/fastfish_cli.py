@@ -14,10 +14,45 @@ import os
 import re
 import sys
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Iterable, Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# orjson 可选（C 实现，直接序列化为 UTF-8 bytes）；不可用时回退标准库 json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+    _json_dumps_bytes = orjson.dumps
+
+    def _json_dumps_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def _json_dumps_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+# requests-toolbelt 可选：流式 multipart 上传，不把整张图片读入内存；不可用时回退 files=
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    TOOLBELT_AVAILABLE = True
+except ImportError:
+    TOOLBELT_AVAILABLE = False
+
+# ijson 可选：批量接入时逐条解析文章并流式上传，不把整个文件读入内存；不可用时整文件解析
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
@@ -26,7 +61,19 @@ from config import get_settings
 
 _COMMERCIAL_HINT = "微信发布、授权、多账号管理需商业版，请联系获取完整版 fastfish"
 
+# Markdown 图片语法 ![alt](src)
+_RE_MD_IMG = re.compile(r"!\[([^\]]*)\]\(([^)]+)\)")
+# 单篇文章内图片并发上传数
+_UPLOAD_MAX_WORKERS = 8
+
+# 模块级 Session：同一命令内的多次 API 调用（上传图片 + 接入等）复用连接
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
 
+
+@lru_cache(maxsize=1)
 def get_api_base_url() -> str:
     settings = get_settings()
     base = (os.getenv("MEDIA_AGENT_BASE_URL") or os.getenv("FASTFISH_BASE_URL") or "").strip()
@@ -38,6 +85,7 @@ def get_api_base_url() -> str:
     return f"http://{host}:{settings.api_port}"
 
 
+@lru_cache(maxsize=1)
 def get_auth_headers() -> dict[str, str]:
     headers = {}
     api_key = os.getenv("MEDIA_AGENT_API_KEY") or get_settings().api_key
@@ -46,15 +94,36 @@ def get_auth_headers() -> dict[str, str]:
     return headers
 
 
-def call_api(method: str, endpoint: str, data: dict[str, Any] | None = None, timeout: int = 60) -> dict[str, Any]:
+@lru_cache(maxsize=1)
+def _json_headers() -> dict[str, str]:
+    return {"Content-Type": "application/json", **get_auth_headers()}
+
+
+def _reset_caches() -> None:
+    """清空 API 地址与请求头缓存（环境变量变更后调用）。"""
+    get_api_base_url.cache_clear()
+    get_auth_headers.cache_clear()
+    _json_headers.cache_clear()
+
+
+def call_api(
+    method: str,
+    endpoint: str,
+    data: dict[str, Any] | None = None,
+    timeout: int = 60,
+    body: bytes | Iterable[bytes] | None = None,
+) -> dict[str, Any]:
+    """调用 API。body 为已编码的 JSON（可为 bytes 迭代器，分块发送），给出时忽略 data。"""
     base_url = get_api_base_url()
     url = f"{base_url}{endpoint}"
-    headers = {"Content-Type": "application/json", **get_auth_headers()}
+    headers = _json_headers()
     try:
         if method.upper() == "GET":
-            r = requests.get(url, headers=headers, timeout=timeout)
+            r = _SESSION.get(url, headers=headers, timeout=timeout)
         elif method.upper() == "POST":
-            r = requests.post(url, headers=headers, json=data or {}, timeout=timeout)
+            if body is None:
+                body = _json_dumps_bytes(data or {})
+            r = _SESSION.post(url, headers=headers, data=body, timeout=timeout)
         else:
             return {"ok": False, "error": f"不支持的 HTTP 方法: {method}"}
         r.raise_for_status()
@@ -69,10 +138,14 @@ def _upload_image(path: str) -> str | None:
         return None
     try:
         with open(p, "rb") as f:
-            files = {"file": (p.name or "image.jpg", f, "image/jpeg")}
-            base = get_api_base_url()
-            headers = get_auth_headers()
-            r = requests.post(f"{base}/api/images/upload", headers=headers, files=files, timeout=60)
+            field = (p.name or "image.jpg", f, "image/jpeg")
+            url = f"{get_api_base_url()}/api/images/upload"
+            if TOOLBELT_AVAILABLE:
+                m = MultipartEncoder(fields={"file": field})
+                headers = {**get_auth_headers(), "Content-Type": m.content_type}
+                r = _SESSION.post(url, headers=headers, data=m, timeout=60)
+            else:
+                r = _SESSION.post(url, headers=get_auth_headers(), files={"file": field}, timeout=60)
             r.raise_for_status()
             data = r.json()
             if data.get("ok") and data.get("path"):
@@ -82,22 +155,51 @@ def _upload_image(path: str) -> str | None:
     return None
 
 
+def _resolve_local_image(src: str, base: Path) -> str | None:
+    """本地图片返回其路径；URL、data URI 或文件不存在时返回 None。"""
+    if src.startswith(("http://", "https://", "data:")):
+        return None
+    path = Path(src)
+    if not path.is_absolute():
+        path = base / src
+    if path.exists() and path.is_file():
+        return str(path)
+    return None
+
+
 def _upload_local_images_in_content(content: str) -> str:
+    if "![" not in content:
+        return content
     base = get_settings().images_base_path
+    # 先收集全部本地图片并发上传（同一图片只传一次），再按结果一次替换
+    local_paths = {
+        src: path for _, src in _RE_MD_IMG.findall(content) if (path := _resolve_local_image(src, base))
+    }
+    if not local_paths:
+        return content
+    unique_paths = list(dict.fromkeys(local_paths.values()))
+    with ThreadPoolExecutor(max_workers=min(_UPLOAD_MAX_WORKERS, len(unique_paths))) as ex:
+        uploaded_map = dict(zip(unique_paths, ex.map(_upload_image, unique_paths)))
+
     def replace_md(m):
-        src = m.group(2)
-        if src.startswith(("http://", "https://", "data:")):
-            return m.group(0)
-        path = Path(src)
-        if not path.is_absolute():
-            path = base / src
-        if path.exists() and path.is_file():
-            uploaded = _upload_image(str(path))
-            if uploaded:
-                return f"![{m.group(1)}]({uploaded})"
+        path = local_paths.get(m.group(2))
+        uploaded = uploaded_map.get(path) if path else None
+        if uploaded:
+            return f"![{m.group(1)}]({uploaded})"
         return m.group(0)
-    content = re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", replace_md, content)
-    return content
+    return _RE_MD_IMG.sub(replace_md, content)
+
+
+def _read_content(args: argparse.Namespace) -> str | None:
+    """按 --content-stdin、--content-file、--content 的优先级读取正文。"""
+    if getattr(args, "content_stdin", False):
+        return sys.stdin.read()
+    content_file = getattr(args, "content_file", None)
+    if content_file:
+        # 按字节一次读入再解码，换行统一为 \n（与文本模式读取一致）
+        text = Path(content_file).read_bytes().decode("utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+    return getattr(args, "content", None)
 
 
 def cmd_get_available_articles(args: argparse.Namespace) -> dict[str, Any]:
@@ -105,14 +207,7 @@ def cmd_get_available_articles(args: argparse.Namespace) -> dict[str, Any]:
 
 
 def cmd_ingest_article(args: argparse.Namespace) -> dict[str, Any]:
-    content_file = getattr(args, "content_file", None)
-    content_stdin = getattr(args, "content_stdin", False)
-    content = getattr(args, "content", None)
-    if content_stdin:
-        content = sys.stdin.read()
-    elif content_file:
-        with open(content_file, "r", encoding="utf-8") as f:
-            content = f.read()
+    content = _read_content(args)
     if content is None:
         return {"ok": False, "error": "需要提供 --content、--content-file 或 --content-stdin"}
     content = _upload_local_images_in_content(content)
@@ -142,13 +237,7 @@ def cmd_ingest_article(args: argparse.Namespace) -> dict[str, Any]:
 
 
 def cmd_update_article(args: argparse.Namespace) -> dict[str, Any]:
-    content = getattr(args, "content", None)
-    content_file = getattr(args, "content_file", None)
-    if getattr(args, "content_stdin", False):
-        content = sys.stdin.read()
-    elif content_file:
-        with open(content_file, "r", encoding="utf-8") as f:
-            content = f.read()
+    content = _read_content(args)
     if content is not None:
         content = _upload_local_images_in_content(content)
     cover_pic = getattr(args, "cover_pic", None)
@@ -175,11 +264,33 @@ def cmd_ingest_articles_batch(args: argparse.Namespace) -> dict[str, Any]:
     articles_file = getattr(args, "articles_file", None)
     if not articles_file:
         return {"ok": False, "error": "需要提供 --articles-file"}
-    with open(articles_file, "r", encoding="utf-8") as f:
-        articles = json.load(f)
+    with open(articles_file, "rb") as f:
+        if IJSON_AVAILABLE:
+            # 顶层为数组时才流式上传；否则走整文件解析，由服务端校验并返回错误
+            try:
+                if _starts_with_array(f):
+                    return call_api("POST", "/api/articles/ingest/batch", body=_iter_articles_body(f))
+            except ijson.JSONError as e:
+                return {"ok": False, "error": f"文章文件 JSON 解析失败: {e}"}
+        articles = _json_loads(f.read())
     return call_api("POST", "/api/articles/ingest/batch", {"articles": articles})
 
 
+def _starts_with_array(f: BinaryIO) -> bool:
+    """读取首个 JSON 记号判断顶层是否为数组，随后将文件指针复位。"""
+    event = next(ijson.parse(f), None)
+    f.seek(0)
+    return event is not None and event[1] == "start_array"
+
+
+def _iter_articles_body(f: BinaryIO) -> Iterator[bytes]:
+    """逐条读取文章数组并拼出 {"articles": [...]} 请求体，内存中只保留当前一条。"""
+    yield b'{"articles":['
+    for i, article in enumerate(ijson.items(f, "item", use_float=True)):
+        yield (b"," if i else b"") + _json_dumps_bytes(article)
+    yield b"]}"
+
+
 def cmd_publish_article(args: argparse.Namespace) -> dict[str, Any]:
     return {"ok": False, "message": _COMMERCIAL_HINT}
 
@@ -189,13 +300,8 @@ def cmd_preview_article(args: argparse.Namespace) -> dict[str, Any]:
     list_index = getattr(args, "list_index", None)
     article_id = getattr(args, "article_id", None)
     if list_index is not None:
-        items = call_api("GET", "/api/articles/available")
-        if not items.get("ok") or not items.get("items"):
-            return {"ok": False, "error": "无法获取可发列表"}
-        idx = min(list_index - 1, len(items["items"]) - 1)
-        if idx < 0:
-            return {"ok": False, "error": f"list_index {list_index} 无效"}
-        article_id = items["items"][idx].get("article_id")
+        # 服务端按序号直接返回预览，一次请求完成定位与渲染
+        return _open_preview(f"/api/articles/preview-html-by-index/{list_index}")
     if article_id is None:
         return {"ok": False, "error": "需要提供 --article-id 或 --list-index"}
     return cmd_preview_html(argparse.Namespace(article_id=article_id))
@@ -206,18 +312,21 @@ def cmd_preview_html(args: argparse.Namespace) -> dict[str, Any]:
     article_id = getattr(args, "article_id", None)
     if article_id is None:
         return {"ok": False, "error": "需要提供 --article-id"}
-    base = get_api_base_url()
-    url = f"{base}/api/articles/preview-html/{article_id}"
-    headers = get_auth_headers()
+    return _open_preview(f"/api/articles/preview-html/{article_id}")
+
+
+def _open_preview(endpoint: str) -> dict[str, Any]:
+    url = f"{get_api_base_url()}{endpoint}"
     try:
-        r = requests.get(url, headers=headers, timeout=30)
+        r = _SESSION.get(url, headers=get_auth_headers(), timeout=30)
         r.raise_for_status()
-        html = r.text
     except requests.exceptions.RequestException as e:
         return {"ok": False, "error": f"获取预览失败: {str(e)}"}
+    article_id = r.headers.get("X-Article-Id") or endpoint.rsplit("/", 1)[-1]
     import tempfile
     tmp = Path(tempfile.gettempdir()) / f"fastfish_preview_{article_id}.html"
-    tmp.write_text(html, encoding="utf-8")
+    # 直接写入响应字节，省去解码再编码
+    tmp.write_bytes(r.content)
     webbrowser.open(f"file://{tmp}")
     return {"ok": True, "preview_path": str(tmp), "message": "已在浏览器中打开本地预览"}
 
@@ -233,13 +342,7 @@ def cmd_render_markdown(args: argparse.Namespace) -> dict[str, Any]:
 
 
 def cmd_normalize_content(args: argparse.Namespace) -> dict[str, Any]:
-    content = getattr(args, "content", None)
-    content_file = getattr(args, "content_file", None)
-    if getattr(args, "content_stdin", False):
-        content = sys.stdin.read()
-    elif content_file:
-        with open(content_file, "r", encoding="utf-8") as f:
-            content = f.read()
+    content = _read_content(args)
     if not content:
         return {"ok": False, "error": "需要提供 --content、--content-file 或 --content-stdin"}
     return call_api("POST", "/api/articles/normalize", {"content": content})
@@ -247,13 +350,7 @@ def cmd_normalize_content(args: argparse.Namespace) -> dict[str, Any]:
 
 def cmd_check_compliance(args: argparse.Namespace) -> dict[str, Any]:
     title = getattr(args, "title", None) or ""
-    content = getattr(args, "content", None)
-    content_file = getattr(args, "content_file", None)
-    if getattr(args, "content_stdin", False):
-        content = sys.stdin.read()
-    elif content_file:
-        with open(content_file, "r", encoding="utf-8") as f:
-            content = f.read()
+    content = _read_content(args)
     if not content:
         return {"ok": False, "error": "需要提供 --content、--content-file 或 --content-stdin"}
     return call_api("POST", "/api/articles/check-compliance", {"title": title, "content": content})
@@ -367,7 +464,9 @@ def main() -> None:
     else:
         result = {"ok": False, "error": f"未知命令: {args.command}"}
 
-    print(json.dumps(result, ensure_ascii=False, indent=2))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_json_dumps_pretty(result) + b"\n")
+    sys.stdout.buffer.flush()
 
 
 if __name__ == "__main__":
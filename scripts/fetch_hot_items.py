@@ -26,15 +26,27 @@ except ImportError:
 
 from core.daily_hot import (
     delete_all_raw_items,
-    fetch_from_pearktrue,
     fetch_platforms,
-    save_raw_items,
+    iter_fetch_many,
+    save_raw_items_many,
 )
+from core.db import get_connection
+
+
+# 日志先写入内存，结束时一次性输出，避免 cron 下逐行 write
+_log_buf: list[str] = []
 
 
 def log(msg: str) -> None:
     ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{ts}] {msg}")
+    _log_buf.append(f"[{ts}] {msg}\n")
+
+
+def _flush_log() -> None:
+    if _log_buf:
+        sys.stdout.write("".join(_log_buf))
+        sys.stdout.flush()
+        _log_buf.clear()
 
 
 def main() -> int:
@@ -44,22 +56,23 @@ def main() -> int:
         log("获取平台列表失败，跳过拉取")
         return 0
 
-    # 每次拉取前清空全部旧数据
-    deleted = delete_all_raw_items()
-    if deleted:
-        log(f"  清空旧数据 {deleted} 条")
-
     fetched_at = int(time.time())
-    total = 0
-    for source in sorted(platforms):
-        items = fetch_from_pearktrue(source)
+    fetched: dict[str, list] = {}
+    for source, items in iter_fetch_many(sorted(platforms)):
         if items:
-            n = save_raw_items(source, items, fetched_at)
-            total += n
-            log(f"  {source}: 写入 {n} 条")
+            fetched[source] = items
+            log(f"  {source}: 拉取 {len(items)} 条")
         else:
             log(f"  {source}: 无数据或拉取失败")
 
+    # 清空旧数据与写入新数据同一事务提交：只落盘一次，读取方也不会看到空表
+    with get_connection():
+        deleted = delete_all_raw_items()
+        total = save_raw_items_many(fetched, fetched_at)
+    if deleted:
+        log(f"  清空旧数据 {deleted} 条")
+    log(f"  写入 {total} 条")
+
     log(f"=== 拉取完成，共 {total} 条（{len(platforms)} 个平台）===")
     return 0
 
@@ -69,6 +82,9 @@ if __name__ == "__main__":
         sys.exit(main())
     except Exception as e:
         log(f"执行异常: {e}")
+        _flush_log()
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        _flush_log()
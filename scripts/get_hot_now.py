@@ -30,36 +30,37 @@ except ImportError:
     pass
 
 from core.daily_hot import (
-    fetch_from_pearktrue,
     fetch_platforms,
-    filter_items,
+    filter_and_dedupe,
     get_push_configs,
     get_today_raw_items,
+    iter_fetch_many,
     save_raw_items,
 )
-from core.daily_hot import _dedupe_by_link
+from core.db import get_connection
 import time
+from datetime import datetime
 
 
 def _format_text(items: list[dict], category_name: str | None = None) -> str:
     """格式化为可读文本。"""
-    from datetime import datetime
     date_str = datetime.now().strftime("%Y-%m-%d %H:%M")
     header = f"【{category_name}】实时热点 {date_str}" if category_name else f"实时热点 {date_str}"
     lines = [header, ""]
+    append = lines.append
     for i, item in enumerate(items[:30], 1):
         title = (item.get("title") or "").strip()
+        if not title:
+            continue
+        append(f"{i}. [{item.get('source', '')}] {title}")
+        hot = item.get("hot")
+        if hot:
+            append(f"   热度: {hot}")
         link = (item.get("link") or "").strip()
-        source = item.get("source", "")
-        hot = item.get("hot", "")
-        if title:
-            lines.append(f"{i}. [{source}] {title}")
-            if hot:
-                lines.append(f"   热度: {hot}")
-            if link:
-                lines.append(f"   {link}")
-            lines.append("")
-    return "\n".join(lines).strip()
+        if link:
+            append(f"   {link}")
+        append("")
+    return "\n".join(lines).rstrip()
 
 
 def main() -> int:
@@ -130,7 +131,6 @@ def main() -> int:
                 break
         if not found:
             try:
-                from core.db import get_connection
                 with get_connection() as conn:
                     cur = conn.execute(
                         """SELECT sources, include_keywords, exclude_keywords, category_name
@@ -182,18 +182,19 @@ def main() -> int:
     else:
         # 实时从 API 拉取，需指定 sources
         fetched_at = int(time.time())
-        for source in sources:
-            items = fetch_from_pearktrue(source)
-            for item in items[: args.limit]:
+        fetched: dict[str, list] = {}
+        # 按完成先后写库；结果仍按 sources 顺序汇总，去重保留哪条与平台顺序有关
+        for source, items in iter_fetch_many(sources):
+            fetched[source] = items[: args.limit]
+            if args.save and items:
+                save_raw_items(source, fetched[source], fetched_at)
+        for source in dict.fromkeys(sources):
+            for item in fetched.get(source, []):
                 item["source"] = source
                 all_items.append(item)
-            if args.save and items:
-                save_raw_items(source, items[: args.limit], fetched_at)
 
-    if include_keywords or exclude_keywords:
-        all_items = filter_items(all_items, include_keywords, exclude_keywords)
-    all_items = _dedupe_by_link(all_items)
-    all_items.sort(key=lambda x: (x.get("source", ""), x.get("rank", 999)))
+    # 先过滤再按 link 去重，同一 link 只有部分条目命中关键词时不会整条丢失
+    all_items = filter_and_dedupe(all_items, include_keywords, exclude_keywords)
 
     if args.format == "json":
         out = json.dumps(all_items, ensure_ascii=False, indent=2)
@@ -27,69 +27,87 @@ except ImportError:
     pass
 
 from core.daily_hot import (
-    already_pushed_in_window,
-    already_pushed_today,
-    filter_items,
+    PUSH_STATUS_FAILED,
+    PUSH_STATUS_OK,
+    PUSH_STATUS_UNKNOWN,
+    filter_and_dedupe,
     format_push_message,
     get_push_configs,
     get_today_raw_items,
-    push_to_im,
-    record_push_history,
+    push_batch,
+    pushed_config_ids_in_window,
+    pushed_config_ids_today,
+    record_push_history_many,
 )
-from core.daily_hot import _dedupe_by_link
+
+
+# 日志先写入内存，结束时一次性输出，避免 cron 下逐行 write
+_log_buf: list[str] = []
 
 
 def log(msg: str) -> None:
     ts = time.strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{ts}] {msg}")
+    _log_buf.append(f"[{ts}] {msg}\n")
+
+
+def _flush_log() -> None:
+    if _log_buf:
+        sys.stdout.write("".join(_log_buf))
+        sys.stdout.flush()
+        _log_buf.clear()
 
 
 def main() -> int:
     log("=== 开始每日热点推送 ===")
-    configs = get_push_configs()
-    if not configs:
-        log("未找到启用的推送配置，跳过")
-        return 0
-
     force = os.getenv("HOT_PUSH_FORCE", "").strip().lower() in ("1", "true", "yes")
     now = time.localtime()
     current_time = f"{now.tm_hour:02d}:{now.tm_min:02d}"
+    # openclaw 占位配置（由 OpenClaw Cron + announce 推送）与当前时间不可能匹配的配置在 SQL 中排除
+    configs = get_push_configs(current_time=None if force else current_time, include_openclaw=False)
+    if not configs:
+        log("无当前需推送的启用配置，跳过")
+        return 0
+
     pushed = 0
+    jobs = []
+    raw_cache: dict[tuple[str, ...], list[dict]] = {}
+    filtered_cache: dict[tuple, list[dict]] = {}
+    # 已推送记录各查一次，循环内只做集合判断（推送在循环结束后才发生，快照不会过期）
+    pushed_in_window = pushed_config_ids_in_window(2)
+    pushed_today = pushed_config_ids_today()
     for cfg in configs:
-        # 跳过 openclaw 占位配置（由 OpenClaw Cron + announce 推送）
-        if (cfg.get("im_channel") or "").lower() == "openclaw" or (
-            cfg.get("webhook_url") or ""
-        ).strip().startswith("openclaw://"):
-            log(f"  [{cfg.get('category_name')}] openclaw 模式，跳过（由 OpenClaw Cron 推送）")
-            continue
-
         push_time = (cfg.get("push_time") or "").strip()
-        push_times = [t.strip() for t in push_time.split(",") if t.strip()]
+        push_times = frozenset(t for t in map(str.strip, push_time.split(",")) if t)
         if not force and push_times and current_time not in push_times:
             continue
-
         config_id = cfg["id"]
         # 多时间点用 2 小时窗口去重，单时间点用今日去重
         if len(push_times) > 1:
-            if already_pushed_in_window(config_id, 2):
+            if config_id in pushed_in_window:
                 log(f"  [{cfg['category_name']}] 本窗口已推送，跳过")
                 continue
         else:
-            if already_pushed_today(config_id):
+            if config_id in pushed_today:
                 log(f"  [{cfg['category_name']}] 今日已推送，跳过")
                 continue
 
         sources = cfg.get("sources") or []
-        # sources 为空表示取全部平台，推送时仅按关键词过滤
-        items = get_today_raw_items(sources)
-        items = filter_items(
-            items,
-            cfg.get("include_keywords") or [],
-            cfg.get("exclude_keywords") or [],
-        )
-        items = _dedupe_by_link(items)
-        items.sort(key=lambda x: (x.get("source", ""), x.get("rank", 999)))
-        items = items[: cfg.get("max_items", 10)]
+        include_keywords = cfg.get("include_keywords") or []
+        exclude_keywords = cfg.get("exclude_keywords") or []
+        # 平台集合与关键词都相同的配置（关键词常由 update_hot_push_keywords 统一写入）共用过滤结果
+        raw_key = tuple(sorted(sources))
+        filter_key = (raw_key, tuple(include_keywords), tuple(exclude_keywords))
+        matched = filtered_cache.get(filter_key)
+        if matched is None:
+            # sources 为空表示取全部平台；相同平台集合的配置共用一次查询
+            # （filter_and_dedupe 返回新列表、不修改条目，缓存结果可安全复用）
+            raw = raw_cache.get(raw_key)
+            if raw is None:
+                raw = raw_cache[raw_key] = get_today_raw_items(sources)
+            # 先过滤再去重，结果已按 (source, rank) 排序，前 max_items 条直接切片
+            matched = filter_and_dedupe(raw, include_keywords, exclude_keywords)
+            filtered_cache[filter_key] = matched
+        items = matched[: cfg.get("max_items", 10)]
 
         if not items:
             log(f"  [{cfg['category_name']}] 过滤后无数据，跳过推送")
@@ -105,20 +123,26 @@ def main() -> int:
                 webhook = os.getenv("HOT_PUSH_DINGTALK_WEBHOOK", "")
             elif ch == "telegram":
                 webhook = os.getenv("HOT_PUSH_TELEGRAM_CHAT_ID", "")
-        ok, err = push_to_im(
-            cfg.get("im_channel", "feishu"),
-            webhook,
-            content,
-        )
-        item_ids = [x["id"] for x in items if x.get("id")]
-
+        # 条目均来自 hot_items_raw，id 为自增主键，必然存在且非零
+        item_ids = [x["id"] for x in items]
+        jobs.append((cfg, len(items), item_ids, (cfg.get("im_channel", "feishu"), webhook, content)))
+
+    # 各配置的 webhook 相互独立，统一并发推送
+    results = push_batch([job[3] for job in jobs])
+    history = []
+    for (cfg, n_items, item_ids, _), (ok, err) in zip(jobs, results):
         if ok:
-            record_push_history(config_id, item_ids, 1)
-            log(f"  [{cfg['category_name']}] 推送成功，{len(items)} 条")
+            history.append((cfg["id"], item_ids, PUSH_STATUS_OK, None))
+            log(f"  [{cfg['category_name']}] 推送成功，{n_items} 条")
             pushed += 1
+        elif ok is None:
+            # 请求已发出但未收到响应，可能已送达；记为未知，下次定时任务不重推
+            history.append((cfg["id"], item_ids, PUSH_STATUS_UNKNOWN, err))
+            log(f"  [{cfg['category_name']}] 推送结果未知: {err}")
         else:
-            record_push_history(config_id, item_ids, 0, err)
+            history.append((cfg["id"], item_ids, PUSH_STATUS_FAILED, err))
             log(f"  [{cfg['category_name']}] 推送失败: {err}")
+    record_push_history_many(history)
 
     log(f"=== 推送完成，成功 {pushed} 个配置 ===")
     return 0
@@ -129,6 +153,9 @@ if __name__ == "__main__":
         sys.exit(main())
     except Exception as e:
         log(f"执行异常: {e}")
+        _flush_log()
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        _flush_log()
@@ -22,6 +22,25 @@ except ImportError:
 
 from core.db import get_connection
 
+# orjson 可选（C 实现，直接解析 bytes）；不可用时回退标准库 json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# 紧凑 JSON，减少写入字节；写入仍用标准库 json，保证与库中已有值的比较结果稳定
+_JSON_SEPARATORS = (",", ":")
+
+_CHANGED_CLAUSE = "include_keywords IS NOT ? OR exclude_keywords IS NOT ?"
+
+_SELECT_CONFIGS_SQL = f"SELECT id, category_name, ({_CHANGED_CLAUSE}) FROM hot_push_config"
+
+_UPDATE_KEYWORDS_SQL = (
+    "UPDATE hot_push_config SET include_keywords = ?, exclude_keywords = ?, update_time = ? "
+    f"WHERE {_CHANGED_CLAUSE}"
+)
+
 
 def main() -> int:
     cfg_path = _project_root / "data" / "hot_push_keywords.json"
@@ -32,35 +51,45 @@ def main() -> int:
         return 1
 
     try:
-        with open(cfg_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = _json_loads(cfg_path.read_bytes())
     except (json.JSONDecodeError, OSError) as e:
         print(f"错误: 读取配置失败: {e}")
         return 1
 
     include = data.get("include_keywords")
     exclude = data.get("exclude_keywords")
-    include_kw = list(include) if isinstance(include, list) else []
-    exclude_kw = list(exclude) if isinstance(exclude, list) else []
+    # 去重（保持原有顺序）
+    include_kw = list(dict.fromkeys(include)) if isinstance(include, list) else []
+    exclude_kw = list(dict.fromkeys(exclude)) if isinstance(exclude, list) else []
 
+    # 所有配置写入相同关键词，JSON 与时间戳只需计算一次；查询与更新同一事务，一次提交
+    inc_json = json.dumps(include_kw, ensure_ascii=False, separators=_JSON_SEPARATORS)
+    exc_json = json.dumps(exclude_kw, ensure_ascii=False, separators=_JSON_SEPARATORS)
+    ts = int(time.time())
     with get_connection() as conn:
-        cur = conn.execute("SELECT id, category_name FROM hot_push_config")
-        rows = cur.fetchall()
+        # 仅用于输出：各配置及其关键词是否会变化
+        rows = conn.execute(_SELECT_CONFIGS_SQL, (inc_json, exc_json)).fetchall()
+        # 一条 UPDATE 写入全部需变化的配置；关键词未变化的不写入，
+        # 重复执行同一文件时不产生任何写入
+        updated = 0
+        if rows:
+            cur = conn.execute(
+                _UPDATE_KEYWORDS_SQL,
+                (inc_json, exc_json, ts, inc_json, exc_json),
+            )
+            updated = cur.rowcount
 
     if not rows:
         print("hot_push_config 无数据，请先执行 init_hot_push_config.py")
         return 1
 
-    for row in rows:
-        cfg_id, name = row[0], row[1]
-        with get_connection() as conn:
-            conn.execute(
-                "UPDATE hot_push_config SET include_keywords = ?, exclude_keywords = ?, update_time = ? WHERE id = ?",
-                (json.dumps(include_kw, ensure_ascii=False), json.dumps(exclude_kw, ensure_ascii=False), int(time.time()), cfg_id),
-            )
-        print(f"已更新 config id={cfg_id} [{name}]")
+    for cfg_id, name, changed in rows:
+        if changed:
+            print(f"已更新 config id={cfg_id} [{name}]")
+        else:
+            print(f"无变化 config id={cfg_id} [{name}]")
 
-    print(f"已从 {cfg_path} 同步关键词到 {len(rows)} 个配置")
+    print(f"已从 {cfg_path} 同步关键词到 {len(rows)} 个配置（更新 {updated} 个）")
     return 0
 
 
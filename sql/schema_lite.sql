@@ -130,6 +130,7 @@ CREATE TABLE hot_push_config (
     create_time         INTEGER,
     update_time         INTEGER
 );
+CREATE INDEX IF NOT EXISTS idx_hot_push_config_code_lower ON hot_push_config(LOWER(category_code));
 
 -- 8. 每日热点推送：推送历史
 DROP TABLE IF EXISTS hot_push_history;
@@ -145,5 +146,6 @@ CREATE TABLE hot_push_history (
     FOREIGN KEY (config_id) REFERENCES hot_push_config(id)
 );
 CREATE INDEX IF NOT EXISTS idx_hot_push_history_config_pushed ON hot_push_history(config_id, pushed_at);
+CREATE INDEX IF NOT EXISTS idx_hot_push_history_sent ON hot_push_history(config_id, pushed_at) WHERE status != 0;
 
 PRAGMA foreign_keys = ON;
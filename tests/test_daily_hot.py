@@ -0,0 +1,48 @@
+"""core.daily_hot：今日热点读取后先按关键词过滤，再按 link 去重。"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+
+import pytest
+
+import config
+from core.daily_hot import filter_and_dedupe, get_today_raw_items, save_raw_items
+from core.db import init_database
+
+
+@pytest.fixture
+def temp_db(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    db_path = tmp_path / "media_agent.db"
+    monkeypatch.setenv("MEDIA_AGENT_DB_PATH", str(db_path))
+    monkeypatch.setattr(config, "_SETTINGS", None)
+    init_database()
+    yield db_path
+    config._SETTINGS = None
+
+
+def test_same_link_kept_when_only_higher_rank_row_matches(temp_db: Path) -> None:
+    link = "https://example.com/a"
+    save_raw_items("weibo", [
+        {"title": "无关标题", "link": link, "rank": 1},
+        {"title": "AI 新闻", "link": link, "rank": 2},
+        {"title": "其他 AI", "link": "https://example.com/b", "rank": 3},
+    ], int(time.time()))
+
+    items = filter_and_dedupe(get_today_raw_items(["weibo"]), ["ai"], [])
+
+    assert [(x["title"], x["rank"]) for x in items] == [("AI 新闻", 2), ("其他 AI", 3)]
+
+
+def test_dedupe_keeps_min_rank_without_keywords(temp_db: Path) -> None:
+    link = "https://example.com/a"
+    save_raw_items("zhihu", [{"title": "甲", "link": link, "rank": 5}], int(time.time()))
+    save_raw_items("baidu", [
+        {"title": "乙", "link": link, "rank": 2},
+        {"title": "无链接", "link": "", "rank": 1},
+    ], int(time.time()))
+
+    items = filter_and_dedupe(get_today_raw_items([]), [], [])
+
+    assert [(x["source"], x["title"]) for x in items] == [("baidu", "乙")]
@@ -0,0 +1,38 @@
+"""core.render：lxml 内联路径须与 premailer 输出逐字一致。"""
+
+from __future__ import annotations
+
+import pytest
+
+from core import render
+
+pytestmark = pytest.mark.skipif(
+    not (render.PREMAILER_AVAILABLE and render.LXML_AVAILABLE),
+    reason="需要 premailer 与 lxml",
+)
+
+_SAMPLES = [
+    "# 标题\n\n## 二级 & 标题\n\n段落 **粗** *斜* `code` [链接](http://x.com)\n\n> 引用\n\n"
+    "- a\n- b\n\n1. x\n2. y\n\n```\ncode block\n```\n\n| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+    "![图](http://x/y.png)\n\n---\n\n<p align=\"left\" style=\"color:red; text-align:right\">raw</p>\n",
+    "纯文本一行",
+    "<!-- c -->\n\n文本 <span style='background-color:#abc'>x</span>\n\n"
+    "<img src='a.png' style='float:left; width:10px'>\n\n<table><tr><td>1</td></tr></table>",
+    "### h3\n\n#### h4\n\n<div style='vertical-align:top'>d</div>\n\n***\n\n> > nested\n\nfoot[^1]\n\n[^1]: note",
+]
+
+
+@pytest.mark.parametrize("style", render._SUPPORTED_STYLES)
+@pytest.mark.parametrize("markdown_text", _SAMPLES)
+def test_inline_css_matches_premailer(style: str, markdown_text: str) -> None:
+    css = render._load_css(style)
+    if not css:
+        pytest.skip(f"样式文件 {style}.css 不存在")
+    html = render._get_markdown().convert(markdown_text)
+    assert render._inline_css(html, css) == render._inline_css_premailer(html, css)
+
+
+def test_tag_only_styles_take_lxml_path() -> None:
+    """至少一套内置样式走 lxml 路径，否则上面的对比覆盖不到它。"""
+    css_list = [render._load_css(s) for s in render._SUPPORTED_STYLES]
+    assert any(css and render._parse_tag_only_css(css) is not None for css in css_list)